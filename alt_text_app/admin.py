@@ -1,8 +1,10 @@
-import base64
-
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.urls import reverse
 from django.utils.html import format_html
 
+from alt_text_app.lib.admin_helpers import FasterAdminPaginator, is_changelist_request
 from alt_text_app.models import ImageDocument, OpenRouterAltText
 
 
@@ -16,21 +18,33 @@ class ImageDocumentAdmin(admin.ModelAdmin):
         """
         Renders the thumbnail preview image in admin.
         """
-        if not obj.thumbnail_webp:
+        if not obj.thumbnail_created_at:
             return 'Missing thumbnail'
-        encoded_thumbnail = base64.b64encode(obj.thumbnail_webp).decode('ascii')
+        ## points at the preview endpoint so the browser fetches (and caches) the bytes, instead of inlining base64
         return format_html(
-            '<img src="data:image/webp;base64,{}" style="max-width: 200px; max-height: 100px;" />',
-            encoded_thumbnail,
+            '<img src="{}" style="max-width: 200px; max-height: 100px;" />',
+            reverse('image_preview_url', kwargs={'public_id': obj.public_id}),
         )
 
     thumbnail_preview.short_description = 'Thumbnail preview'
 
+    def alt_text_status(self, obj: ImageDocument) -> str:
+        """
+        Shows the OpenRouter alt-text status, from the row joined in get_queryset().
+        """
+        alt_text_record: OpenRouterAltText | None = getattr(obj, 'openrouter_alt_text', None)
+        return alt_text_record.status if alt_text_record else '-'
+
+    alt_text_status.short_description = 'Alt text status'
+
+    paginator = FasterAdminPaginator
+    show_full_result_count = False  # avoids an extra unfiltered COUNT(*) on filtered changelists
     list_display = [
         'original_filename',
         'user_email',
         'file_size',
         'processing_status',
+        'alt_text_status',
         'uploaded_at',
     ]
     list_filter = [
@@ -72,6 +86,25 @@ class ImageDocumentAdmin(admin.ModelAdmin):
         ('Status', {'fields': ['processing_status', 'processing_error', 'uploaded_at']}),
     ]
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[ImageDocument]:
+        """
+        Selects only the list_display columns on the changelist (keep in sync with list_display), joining the
+          alt-text status so the column doesn't query it per row.
+        """
+        queryset = super().get_queryset(request)
+        if is_changelist_request(request):
+            queryset = queryset.select_related('openrouter_alt_text').only(
+                'id',
+                'original_filename',
+                'user_email',
+                'file_size',
+                'processing_status',
+                'uploaded_at',
+                'openrouter_alt_text__id',
+                'openrouter_alt_text__status',
+            )
+        return queryset
+
 
 @admin.register(OpenRouterAltText)
 class OpenRouterAltTextAdmin(admin.ModelAdmin):
@@ -85,9 +118,12 @@ class OpenRouterAltTextAdmin(admin.ModelAdmin):
         'model',
         'provider',
         'total_tokens',
-        'cost',
+        'cost_usd',
         'completed_at',
     ]
+    list_select_related = ['image_document']
+    paginator = FasterAdminPaginator
+    show_full_result_count = False  # avoids an extra unfiltered COUNT(*) on filtered changelists
     list_filter = [
         'status',
         'provider',
@@ -112,8 +148,11 @@ class OpenRouterAltTextAdmin(admin.ModelAdmin):
         'prompt_tokens',
         'completion_tokens',
         'total_tokens',
-        'cost',
+        'cost_usd',
     ]
+    ## already read-only above (rendered as a link, no <select>); keeps the widget a paged search, not a full-table
+    ##   dropdown, if that field is ever made editable
+    autocomplete_fields = ['image_document']
     fieldsets = [
         ('Document', {'fields': ['image_document']}),
         ('Alt Text', {'fields': ['alt_text', 'prompt', 'status', 'error']}),
@@ -135,7 +174,7 @@ class OpenRouterAltTextAdmin(admin.ModelAdmin):
                     'prompt_tokens',
                     'completion_tokens',
                     'total_tokens',
-                    'cost',
+                    'cost_usd',
                 ]
             },
         ),
@@ -148,3 +187,32 @@ class OpenRouterAltTextAdmin(admin.ModelAdmin):
             },
         ),
     ]
+
+    def cost_usd(self, obj: OpenRouterAltText) -> str:
+        """
+        Shows the micro-USD cost as dollars.
+        """
+        return f'${obj.cost_usd:.6f}' if obj.cost_usd is not None else '-'
+
+    cost_usd.short_description = 'Cost (USD)'
+    cost_usd.admin_order_field = 'cost'
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[OpenRouterAltText]:
+        """
+        Joins the related ImageDocument so list/detail rendering doesn't query it per row.
+        Selects only the list_display columns (and the joined document's id/filename) on the changelist.
+        """
+        queryset = super().get_queryset(request).select_related('image_document')
+        if is_changelist_request(request):
+            queryset = queryset.only(
+                'id',
+                'image_document__id',
+                'image_document__original_filename',
+                'status',
+                'model',
+                'provider',
+                'total_tokens',
+                'cost',  # cost_usd is computed from it
+                'completed_at',
+            )
+        return queryset
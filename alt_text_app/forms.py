@@ -9,6 +9,17 @@ try:
 except (ImportError, OSError):
     MAGIC_AVAILABLE = False
 
+## leading bytes of the supported image formats (WebP is checked separately; its marker is at offset 8)
+IMAGE_MAGIC_SIGNATURES: tuple[bytes, ...] = (
+    b'\x89PNG\r\n\x1a\n',  # png
+    b'\xff\xd8\xff',  # jpeg
+    b'GIF87a',  # gif
+    b'GIF89a',  # gif
+    b'BM',  # bmp
+    b'II*\x00',  # tiff (little-endian)
+    b'MM\x00*',  # tiff (big-endian)
+)
+
 
 class ImageUploadForm(forms.Form):
     """
@@ -41,26 +52,20 @@ class ImageUploadForm(forms.Form):
         if not file.name.lower().endswith(allowed_extensions):
             raise ValidationError('File must be a supported image type.')
 
-        ## Check common image magic bytes
+        ## Read the header once; the magic-byte checks and python-magic both use it
         file.seek(0)
-        header = file.read(12)
+        header = file.read(2048)
         file.seek(0)  # Reset file pointer
 
-        is_png = header.startswith(b'\x89PNG\r\n\x1a\n')
-        is_jpeg = header.startswith(b'\xff\xd8\xff')
-        is_gif = header.startswith(b'GIF87a') or header.startswith(b'GIF89a')
+        ## Check common image magic bytes (`startswith()` takes the whole tuple in one C-level call)
         is_webp = header[0:4] == b'RIFF' and header[8:12] == b'WEBP'
-        is_bmp = header.startswith(b'BM')
-        is_tiff = header.startswith(b'II*\x00') or header.startswith(b'MM\x00*')
-
-        if not (is_png or is_jpeg or is_gif or is_webp or is_bmp or is_tiff):
+        if not (header.startswith(IMAGE_MAGIC_SIGNATURES) or is_webp):
             raise ValidationError('File must be a valid image.')
 
         ## If python-magic is available, use it for additional validation
         if MAGIC_AVAILABLE:
             try:
-                file_type = magic.from_buffer(file.read(2048), mime=True)
-                file.seek(0)  # Reset file pointer
+                file_type = magic.from_buffer(header, mime=True)
 
                 if not file_type.startswith('image/'):
                     raise ValidationError('File must be a valid image.')
@@ -0,0 +1,74 @@
+"""
+Helper classes and functions for the django admin.
+
+Called by:
+    - alt_text_app.admin
+"""
+
+import logging
+
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+
+log = logging.getLogger(__name__)
+
+## below this many rows an exact COUNT(*) is cheap, and table statistics can be stale
+ESTIMATED_COUNT_MIN_ROWS = 10_000
+
+
+def is_changelist_request(request: HttpRequest) -> bool:
+    """
+    Returns True when the admin request is for a model's changelist page.
+    Used to skip large columns that the list doesn't render, while keeping them for the change form.
+    """
+    resolver_match = request.resolver_match
+    is_changelist: bool = resolver_match is not None and (resolver_match.url_name or '').endswith('_changelist')
+    return is_changelist
+
+
+def get_table_row_estimate(model: type[models.Model], using: str) -> int:
+    """
+    Returns the database's statistics-based row estimate for the model's table.
+    Returns 0 when the backend has no cheap estimate (e.g., sqlite).
+    """
+    connection = connections[using]
+    table_name: str = model._meta.db_table
+    sql: str = ''
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'mysql':
+        sql = 'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+    estimate: int = 0
+    if sql:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table_name])
+            row = cursor.fetchone()
+        if row and row[0]:
+            estimate = max(int(row[0]), 0)
+    log.debug('row estimate for %s, ``%s``', table_name, estimate)
+    return estimate
+
+
+class FasterAdminPaginator(Paginator):
+    """
+    Paginator for admin changelists that avoids a full-table COUNT(*) on large, unfiltered querysets.
+    - Unfiltered: uses the table-statistics estimate, when it is large enough to be worth it.
+    - Filtered (or small/unknown estimate): falls back to an exact count.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        """
+        Returns the estimated or exact number of objects.
+        """
+        query = getattr(self.object_list, 'query', None)
+        estimate: int = 0
+        if query is not None and not query.where:
+            estimate = get_table_row_estimate(self.object_list.model, self.object_list.db)
+        if estimate >= ESTIMATED_COUNT_MIN_ROWS:
+            total: int = estimate
+        else:
+            total = self.object_list.count() if query is not None else len(self.object_list)
+        return total
@@ -0,0 +1,69 @@
+"""
+Helpers for caching rendered polling fragments.
+
+Called by:
+    - alt_text_app.views.status_fragment()
+    - alt_text_app.views.upload_image() (invalidation on re-upload)
+    - alt_text_app.lib.sync_processing_helpers (invalidation when processing finishes)
+"""
+
+import logging
+import uuid
+
+from django.core.cache import cache
+
+log = logging.getLogger(__name__)
+
+## pending/processing/failed fragments can change at any time (background work, or a re-upload of a failed image
+##   handled by another worker, whose per-process cache this worker can't invalidate); this just absorbs bursts of pollers
+STATUS_FRAGMENT_ACTIVE_TIMEOUT_SECONDS = 1
+## a completed document never changes status, so its (non-polling) fragment can't go stale
+STATUS_FRAGMENT_COMPLETED_TIMEOUT_SECONDS = 3600
+
+
+def build_status_fragment_cache_key(public_id: uuid.UUID, poll_delay_seconds: int | None = None) -> str:
+    """
+    Returns the cache key for a document's rendered status fragment.
+    Polling fragments embed their next poll delay, so they're keyed by it; completed ones don't poll, so aren't.
+    """
+    key: str = f'status_fragment:{public_id}'
+    if poll_delay_seconds is not None:
+        key = f'{key}:{poll_delay_seconds}'
+    return key
+
+
+def get_status_fragment_html(public_id: uuid.UUID, poll_delay_seconds: int) -> str | None:
+    """
+    Returns the cached status-fragment html (completed, else polling at this poll delay), or None.
+    """
+    completed_key: str = build_status_fragment_cache_key(public_id)
+    active_key: str = build_status_fragment_cache_key(public_id, poll_delay_seconds)
+    cached: dict[str, str] = cache.get_many([completed_key, active_key])  # one round-trip
+    html: str | None = cached.get(completed_key, cached.get(active_key))
+    log.debug('status fragment cache %s for %s', 'hit' if html is not None else 'miss', public_id)
+    return html
+
+
+def set_status_fragment_html(public_id: uuid.UUID, html: str, processing_status: str, poll_delay_seconds: int) -> None:
+    """
+    Caches the status-fragment html, longer for completed documents and briefly for every other state.
+    'failed' is cached briefly too: a re-upload resets it to 'pending', and a stale non-polling fragment would
+      stop the report page's polling for good.
+    """
+    if processing_status == 'completed':
+        key: str = build_status_fragment_cache_key(public_id)
+        timeout_seconds: int = STATUS_FRAGMENT_COMPLETED_TIMEOUT_SECONDS
+    else:
+        key = build_status_fragment_cache_key(public_id, poll_delay_seconds)
+        timeout_seconds = STATUS_FRAGMENT_ACTIVE_TIMEOUT_SECONDS
+    cache.set(key, html, timeout_seconds)
+    return
+
+
+def delete_status_fragment_html(public_id: uuid.UUID) -> None:
+    """
+    Drops the cached completed status-fragment html after a status change.
+    Active-state entries aren't tracked per delay; their one-second timeout already bounds staleness.
+    """
+    cache.delete(build_status_fragment_cache_key(public_id))
+    return
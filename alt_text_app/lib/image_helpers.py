@@ -7,15 +7,56 @@ Called by:
 """
 
 import base64
+import functools
 import hashlib
+import io
 import logging
+import mmap
+import os
+import shutil
+import uuid
 from pathlib import Path
 
 from django.conf import settings as project_settings
+from django.core import signing
 from django.core.files.uploadedfile import UploadedFile
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, HttpResponse
+from django.urls import reverse
 
 log = logging.getLogger(__name__)
 
+## larger than django's default 64KB `chunks()` size, to amortize per-chunk python overhead
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+## must be a multiple of 3, so each base64-encoded chunk ends without padding
+DATA_URL_CHUNK_SIZE = 3 * 256 * 1024
+
+SIGNED_IMAGE_SALT = 'alt_text_app.signed_image'
+
+## subdirectory of IMAGE_UPLOAD_PATH holding webp thumbnails
+THUMBNAIL_DIR_NAME = 'thumbnails'
+
+
+@functools.lru_cache(maxsize=1)
+def get_upload_dir_path() -> Path:
+    """
+    Returns the resolved IMAGE_UPLOAD_PATH.
+    Cached, since `resolve()` stats every path component and the setting is fixed for the process.
+    """
+    return Path(project_settings.IMAGE_UPLOAD_PATH).resolve()
+
+
+@receiver(setting_changed)
+def clear_upload_dir_path(setting: str, **kwargs) -> None:
+    """
+    Clears the cached upload directory when IMAGE_UPLOAD_PATH is overridden (e.g., by tests).
+    """
+    if setting == 'IMAGE_UPLOAD_PATH':
+        get_upload_dir_path.cache_clear()
+    return
+
 
 def get_shibboleth_user_info(request) -> dict[str, str | list[str]]:
     """
@@ -31,49 +72,141 @@ def get_shibboleth_user_info(request) -> dict[str, str | list[str]]:
     }
 
 
-def generate_checksum(file: UploadedFile) -> str:
+def stream_upload_to_disk(file: UploadedFile, extension: str) -> tuple[Path, str]:
     """
-    Generates SHA-256 checksum for uploaded file.
-    """
-    sha256_hash = hashlib.sha256()
-    for chunk in file.chunks():
-        sha256_hash.update(chunk)
-    return sha256_hash.hexdigest()
-
-
-def save_image_file(file: UploadedFile, checksum: str, extension: str) -> Path:
-    """
-    Saves uploaded image file to storage.
+    Saves uploaded image file to storage and generates its SHA-256 checksum, without python-level copies where possible:
+    - on-disk uploads are hashed with `hashlib.file_digest()` (C loop, GIL released) and copied in-kernel (sendfile)
+    - in-memory uploads are hashed and written straight from the BytesIO buffer
+    - anything else is hashed and written chunk by chunk, in a single pass
+    The temporary file is then atomically renamed to its checksum-based name. Returns (image_path, checksum).
     Called by:
         - alt_text_app.views.upload_image()
     """
-    upload_dir_path = Path(project_settings.IMAGE_UPLOAD_PATH)
-    absolute_upload_dir_path = upload_dir_path.resolve()
+    absolute_upload_dir_path = get_upload_dir_path()
     absolute_upload_dir_path.mkdir(parents=True, exist_ok=True)
     safe_extension = extension.lower().lstrip('.')
-    upload_image_path = absolute_upload_dir_path / f'{checksum}.{safe_extension}'
-
-    with open(upload_image_path, 'wb') as dest:
-        for chunk in file.chunks():
-            dest.write(chunk)
-
-    return upload_image_path
+    temp_path = absolute_upload_dir_path / f'.{uuid.uuid4().hex}.part'
+    try:
+        if hasattr(file, 'temporary_file_path'):
+            with open(file.temporary_file_path(), 'rb') as source:
+                sha256_hash = hashlib.file_digest(source, 'sha256')
+            shutil.copyfile(file.temporary_file_path(), temp_path)
+        elif isinstance(file.file, io.BytesIO):
+            with file.file.getbuffer() as buffer, open(temp_path, 'xb') as dest:
+                sha256_hash = hashlib.sha256(buffer)
+                dest.write(buffer)
+        else:
+            sha256_hash = hashlib.sha256()
+            with open(temp_path, 'xb') as dest:
+                for chunk in file.chunks(chunk_size=UPLOAD_CHUNK_SIZE):
+                    sha256_hash.update(chunk)
+                    dest.write(chunk)
+        checksum: str = sha256_hash.hexdigest()
+        upload_image_path = absolute_upload_dir_path / f'{checksum}.{safe_extension}'
+        os.replace(temp_path, upload_image_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return upload_image_path, checksum
+
+
+def drop_file_page_cache(file_path: Path) -> None:
+    """
+    Hints the kernel that a file's cached pages won't be read again soon, so they can be evicted ahead of hotter data
+      (e.g., thumbnails). A no-op where `posix_fadvise()` is unavailable (macOS) or the file is gone.
+    Called by:
+        - alt_text_app.lib.sync_processing_helpers.run_background_processing()
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            with open(file_path, 'rb') as file:
+                os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            log.debug('could not drop page cache for %s', file_path)
+    return
 
 
 def get_image_path(checksum: str, extension: str) -> Path:
     """
     Builds the path to a stored image from its checksum and extension.
     """
-    upload_dir_path = Path(project_settings.IMAGE_UPLOAD_PATH).resolve()
+    upload_dir_path = get_upload_dir_path()
     safe_extension = extension.lower().lstrip('.')
     return upload_dir_path / f'{checksum}.{safe_extension}'
 
 
+def get_thumbnail_path(checksum: str) -> Path:
+    """
+    Builds the path to a stored webp thumbnail from the image checksum.
+    """
+    upload_dir_path = get_upload_dir_path()
+    return upload_dir_path / THUMBNAIL_DIR_NAME / f'{checksum}.webp'
+
+
 def build_image_data_url(image_path: Path, mime_type: str) -> str:
     """
     Builds a base64 data URL for an image file.
+    Encodes in chunks (a multiple of 3 bytes, so no mid-stream padding) straight from an mmap of the file, so neither
+      a full raw copy nor per-chunk `read()` copies of the image are made.
     """
-    image_bytes = image_path.read_bytes()
-    encoded = base64.b64encode(image_bytes).decode('ascii')
     safe_mime_type = mime_type or 'image/*'
-    return f'data:{safe_mime_type};base64,{encoded}'
+    data_url_buffer = bytearray(b'data:')
+    data_url_buffer += safe_mime_type.encode('utf-8')
+    data_url_buffer += b';base64,'
+    with image_path.open('rb') as image_file:
+        file_size: int = os.fstat(image_file.fileno()).st_size
+        if file_size:  # an empty file can't be mapped (and encodes to nothing)
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                with memoryview(mapped_file) as file_view:
+                    for offset in range(0, file_size, DATA_URL_CHUNK_SIZE):
+                        data_url_buffer += base64.b64encode(file_view[offset : offset + DATA_URL_CHUNK_SIZE])
+    data_url: str = data_url_buffer.decode('utf-8')
+    return data_url
+
+
+def build_openrouter_image_url(checksum: str, image_path: Path, mime_type: str) -> str:
+    """
+    Builds the image url sent to OpenRouter.
+    Uses a short-lived signed url when OPENROUTER_IMAGE_URL_ROOT is configured (no base64 encoding, smaller payload);
+      otherwise falls back to an inline base64 data url.
+    """
+    url_root: str = project_settings.OPENROUTER_IMAGE_URL_ROOT.rstrip('/')
+    if url_root:
+        token: str = signing.TimestampSigner(salt=SIGNED_IMAGE_SALT).sign(checksum)
+        image_url: str = f'{url_root}{reverse("signed_image_url", kwargs={"token": token})}'
+    else:
+        image_url = build_image_data_url(image_path, mime_type)
+    return image_url
+
+
+def unsign_image_token(token: str) -> str:
+    """
+    Returns the checksum from a signed-image token.
+
+    Raises:
+        signing.BadSignature: If the token is invalid or older than SIGNED_IMAGE_URL_MAX_AGE_SECONDS
+          (`signing.SignatureExpired` is a subclass).
+    """
+    max_age: int = project_settings.SIGNED_IMAGE_URL_MAX_AGE_SECONDS
+    checksum: str = signing.TimestampSigner(salt=SIGNED_IMAGE_SALT).unsign(token, max_age=max_age)
+    return checksum
+
+
+def build_stored_file_response(file_path: Path, content_type: str) -> HttpResponse:
+    """
+    Builds the response for a file under IMAGE_UPLOAD_PATH.
+    With IMAGE_SENDFILE_HEADER set, returns an empty response whose header tells the web server to send the file;
+      otherwise streams it with FileResponse (which uses the wsgi server's sendfile wrapper when available).
+    """
+    sendfile_header: str = project_settings.IMAGE_SENDFILE_HEADER
+    if sendfile_header == 'X-Accel-Redirect':
+        upload_dir_path = get_upload_dir_path()
+        accel_root: str = project_settings.IMAGE_SENDFILE_ACCEL_ROOT.rstrip('/')
+        response = HttpResponse(content_type=content_type)
+        response[sendfile_header] = f'{accel_root}/{file_path.relative_to(upload_dir_path).as_posix()}'
+    elif sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        response[sendfile_header] = str(file_path)
+    else:
+        response = FileResponse(file_path.open('rb'), content_type=content_type)
+    return response
@@ -0,0 +1,23 @@
+"""
+Helper functions for json responses.
+
+Called by:
+    - alt_text_app.views.info()
+    - alt_text_app.views.version()
+"""
+
+import json
+
+from django.http import HttpRequest
+
+
+def build_json_output(context: dict, request: HttpRequest) -> str:
+    """
+    Serializes the context for a json response: compact by default, indented with `?pretty=1` for human reading.
+    Keys are sorted either way, so the output's key order stays stable for existing consumers.
+    """
+    if request.GET.get('pretty', '') == '1':
+        output: str = json.dumps(context, sort_keys=True, indent=2)
+    else:
+        output = json.dumps(context, sort_keys=True, separators=(',', ':'))
+    return output
@@ -2,6 +2,7 @@
 Helper functions for rendering markdown content.
 """
 
+import functools
 from pathlib import Path
 
 import markdown
@@ -24,9 +25,11 @@ def load_markdown_file(file_path: Path) -> str:
     return html
 
 
+@functools.lru_cache(maxsize=8)
 def load_markdown_from_lib(filename: str) -> str:
     """
     Loads a markdown file stored alongside lib helpers.
+    Cached: these files ship with the code, so they're read and rendered once per process.
     """
     lib_dir: Path = Path(__file__).resolve().parent
     file_path: Path = lib_dir / filename
@@ -6,15 +6,18 @@ Called by:
     - scripts.process_openrouter_summaries (cron background processing)
 """
 
+import atexit
+import functools
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
 
 import httpx
+import trio
 from django.conf import settings as project_settings
 from django.utils import timezone as django_timezone
 
-from alt_text_app.models import OpenRouterAltText
+from alt_text_app.models import MICRO_USD_PER_USD, OpenRouterAltText
 
 log = logging.getLogger(__name__)
 
@@ -22,10 +25,42 @@ OPENROUTER_API_URL = 'https://openrouter.ai/api/v1/chat/completions'
 
 PROMPT_FILE_PATH = Path(__file__).resolve().parent / 'prompt.md'
 
+## fraction of the per-call timeout to wait on a model before also starting the next one
+OPENROUTER_HEDGE_DELAY_FRACTION = 0.6
 
+OPENROUTER_MAX_KEEPALIVE_CONNECTIONS = 20
+OPENROUTER_MAX_CONNECTIONS = 50
+## fail fast on an unreachable host; the per-call timeout still bounds reading the (slow) model response
+OPENROUTER_CONNECT_TIMEOUT_SECONDS = 5.0
+
+
+@functools.lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """
+    Returns the shared OpenRouter client, so keep-alive connections (and their TLS sessions) are reused across calls.
+    The client is thread-safe; timeouts are passed per request.
+
+    Note: Only one of our servers requires a non-default certificate to be specified,
+          so the SYSTEM_CA_BUNDLE environment variable is implemented optionally.
+    """
+    system_ca_bundle = project_settings.SYSTEM_CA_BUNDLE
+    client = httpx.Client(
+        verify=system_ca_bundle or True,
+        limits=httpx.Limits(
+            max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=OPENROUTER_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+    )
+    atexit.register(client.close)
+    return client
+
+
+@functools.lru_cache(maxsize=1)
 def load_prompt_template() -> str:
     """
     Loads the OpenRouter prompt template from disk.
+    The template ships with the code, so it's read once per process.
     """
     prompt_text = PROMPT_FILE_PATH.read_text(encoding='utf-8')
     return prompt_text
@@ -34,10 +69,10 @@ def load_prompt_template() -> str:
 def get_api_key() -> str:
     """
     Retrieves the OpenRouter API key from environment.
+    (Settings are parsed once at startup, so this is just an attribute lookup; the key itself is never logged.)
     """
-    log.debug('starting get_api_key()')
     key = project_settings.OPENROUTER_API_KEY
-    log.debug(f'key, ``{key}``')
+    log.debug('api key configured, ``%s``', bool(key))
     return key
 
 
@@ -53,7 +88,7 @@ def build_prompt() -> str:
     Builds the prompt for OpenRouter.
     """
     prompt = load_prompt_template()
-    log.debug(f'prompt, ``{prompt}``')
+    log.debug('prompt, ``%s``', prompt)
     return prompt
 
 
@@ -65,9 +100,6 @@ def call_openrouter(prompt: str, api_key: str, model: str, timeout_seconds: floa
     Raises:
         httpx.TimeoutException: If the request exceeds timeout_seconds.
         httpx.HTTPStatusError: If the API returns an error status.
-
-    Note: Only one of our servers requires a non-default certificate to be specified,
-          so the SYSTEM_CA_BUNDLE environment variable is implemented optionally.
     """
     headers = {
         'Authorization': f'Bearer {api_key}',
@@ -89,25 +121,21 @@ def call_openrouter(prompt: str, api_key: str, model: str, timeout_seconds: floa
         ],
     }
 
-    client_kwargs = {'timeout': timeout_seconds}
-    system_ca_bundle = project_settings.SYSTEM_CA_BUNDLE
-    if system_ca_bundle:
-        client_kwargs['verify'] = system_ca_bundle
-
-    with httpx.Client(**client_kwargs) as client:
-        response = client.post(OPENROUTER_API_URL, headers=headers, json=payload)
-        log.debug(f'response, ``{response}``')
-        if response.is_error:
-            log.error(
-                'OpenRouter request failed with status=%s, model=%s, response=%s',
-                response.status_code,
-                model,
-                response.text,
-            )
-        response.raise_for_status()
-        jsn_response = response.json()
-        log.debug(f'jsn_response, ``{jsn_response}``')
-        return jsn_response
+    client = get_http_client()
+    timeout = httpx.Timeout(timeout_seconds, connect=OPENROUTER_CONNECT_TIMEOUT_SECONDS)
+    response = client.post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=timeout)
+    log.debug('response, ``%s``', response)
+    if response.is_error:
+        log.error(
+            'OpenRouter request failed with status=%s, model=%s, response=%s',
+            response.status_code,
+            model,
+            response.text,
+        )
+    response.raise_for_status()
+    jsn_response = response.json()
+    log.debug('jsn_response, ``%s``', jsn_response)
+    return jsn_response
 
     ## end def call_openrouter()
 
@@ -121,29 +149,101 @@ def call_openrouter_with_model_order(
 ) -> dict:
     """
     Calls OpenRouter with models in the provided order until one succeeds.
+    Calls are hedged: if a model fails, or hasn't responded within `timeout_seconds * OPENROUTER_HEDGE_DELAY_FRACTION`,
+      the next model is started alongside it, and the first successful response wins.
+    Raises the last model's exception if every model fails.
     """
-    last_exception: Exception | None = None
-    response_json: dict = {}
     log.debug('OpenRouter model order: %s', model_order)
+    results_holder_dct: dict = {'response_json': None, 'exceptions': {}}  # receives attempt results as they're produced
+    trio.run(manage_hedged_calls, prompt, api_key, model_order, timeout_seconds, image_data_url, results_holder_dct)
 
-    for index, model in enumerate(model_order, start=1):
-        try:
-            log.info('OpenRouter attempt %s/%s with model=%s', index, len(model_order), model)
-            response_json = call_openrouter(prompt, api_key, model, timeout_seconds, image_data_url)
-            last_exception = None
-            break
-        except Exception as exc:
-            last_exception = exc
-            log.warning('OpenRouter call failed for model=%s, trying next if available', model)
-
-    if last_exception is not None:
-        raise last_exception
+    if results_holder_dct['response_json'] is None and results_holder_dct['exceptions']:
+        last_index: int = max(results_holder_dct['exceptions'])
+        raise results_holder_dct['exceptions'][last_index]
 
+    response_json: dict = results_holder_dct['response_json'] or {}
     return response_json
 
     ## end def call_openrouter_with_model_order()
 
 
+async def manage_hedged_calls(
+    prompt: str,
+    api_key: str,
+    model_order: list[str],
+    timeout_seconds: float,
+    image_data_url: str,
+    results_holder_dct: dict,
+) -> None:
+    """
+    Starts one attempt per model, staggered by the hedge delay; the first success cancels the rest.
+    Called by:
+        - call_openrouter_with_model_order()
+    """
+    hedge_delay_seconds: float = timeout_seconds * OPENROUTER_HEDGE_DELAY_FRACTION
+    async with trio.open_nursery() as nursery:
+        for index, model in enumerate(model_order, start=1):
+            failed_event = trio.Event()
+            nursery.start_soon(
+                run_hedged_attempt,
+                index,
+                len(model_order),
+                model,
+                prompt,
+                api_key,
+                timeout_seconds,
+                image_data_url,
+                failed_event,
+                nursery.cancel_scope,
+                results_holder_dct,
+            )
+            if index < len(model_order):
+                ## wait for this attempt to fail, or for the hedge delay, before starting the next model
+                with trio.move_on_after(hedge_delay_seconds):
+                    await failed_event.wait()
+    return
+
+
+async def run_hedged_attempt(
+    index: int,
+    total: int,
+    model: str,
+    prompt: str,
+    api_key: str,
+    timeout_seconds: float,
+    image_data_url: str,
+    failed_event: trio.Event,
+    cancel_scope: trio.CancelScope,
+    results_holder_dct: dict,
+) -> None:
+    """
+    Runs a single (blocking) OpenRouter call in a worker thread and records its outcome.
+    If cancelled because another model won, the thread is abandoned and its result discarded.
+    Called by:
+        - manage_hedged_calls()
+    """
+    log.info('OpenRouter attempt %s/%s with model=%s', index, total, model)
+    try:
+        response_json: dict = await trio.to_thread.run_sync(
+            call_openrouter,
+            prompt,
+            api_key,
+            model,
+            timeout_seconds,
+            image_data_url,
+            abandon_on_cancel=True,
+        )
+    except Exception as exc:
+        log.warning('OpenRouter call failed for model=%s, trying next if available', model)
+        results_holder_dct['exceptions'][index] = exc
+        failed_event.set()
+    else:
+        if results_holder_dct['response_json'] is None:
+            results_holder_dct['response_json'] = response_json
+            cancel_scope.cancel()
+    return
+
+
 def parse_openrouter_response(response_json: dict) -> dict:
     """
     Parses the OpenRouter response and extracts relevant fields.
@@ -158,6 +258,7 @@ def parse_openrouter_response(response_json: dict) -> dict:
         'prompt_tokens': None,
         'completion_tokens': None,
         'total_tokens': None,
+        'cost': None,
     }
 
     ## Extract alt text from choices
@@ -180,6 +281,9 @@ def parse_openrouter_response(response_json: dict) -> dict:
     result['prompt_tokens'] = usage.get('prompt_tokens')
     result['completion_tokens'] = usage.get('completion_tokens')
     result['total_tokens'] = usage.get('total_tokens')
+    api_cost = usage.get('cost')  # US dollars
+    if isinstance(api_cost, (int, float)):
+        result['cost'] = round(api_cost * MICRO_USD_PER_USD)
 
     ## Extract created timestamp
     created = response_json.get('created')
@@ -206,9 +310,28 @@ def persist_openrouter_alt_text(alt_text_record: OpenRouterAltText, response_jso
     alt_text_record.prompt_tokens = parsed['prompt_tokens']
     alt_text_record.completion_tokens = parsed['completion_tokens']
     alt_text_record.total_tokens = parsed['total_tokens']
+    alt_text_record.cost = parsed['cost']
     utc_now = datetime.now(tz=timezone.utc)
     naive_now = django_timezone.make_naive(utc_now)
     alt_text_record.status = 'completed'
     alt_text_record.completed_at = naive_now
     alt_text_record.error = None
-    alt_text_record.save()
+    ## only the response-derived columns; the prompt and requested_at were saved before the call
+    alt_text_record.save(
+        update_fields=[
+            'raw_response_json',
+            'alt_text',
+            'openrouter_response_id',
+            'provider',
+            'model',
+            'finish_reason',
+            'openrouter_created_at',
+            'prompt_tokens',
+            'completion_tokens',
+            'total_tokens',
+            'cost',
+            'status',
+            'completed_at',
+            'error',
+        ]
+    )
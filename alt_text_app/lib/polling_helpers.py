@@ -0,0 +1,39 @@
+"""
+Helpers for the report page's htmx polling backoff.
+Each fragment response carries the delay it was fetched with; the next poll waits a bit longer, up to a cap,
+  so a report left open on a slow job settles to a few requests a minute instead of one every couple of seconds.
+
+Called by:
+    - alt_text_app.views.view_report()
+    - alt_text_app.views.status_fragment()
+    - alt_text_app.views.alt_text_fragment()
+"""
+
+import logging
+
+from django.http import HttpRequest
+
+log = logging.getLogger(__name__)
+
+STATUS_POLL_MIN_DELAY_SECONDS = 2
+ALT_TEXT_POLL_MIN_DELAY_SECONDS = 3
+POLL_MAX_DELAY_SECONDS = 15
+POLL_DELAY_GROWTH_FACTOR = 1.5
+
+
+def get_next_poll_delay(request: HttpRequest, min_delay_seconds: int) -> int:
+    """
+    Returns the number of seconds the next poll should wait.
+    Grows the `delay` query-param of the current poll by POLL_DELAY_GROWTH_FACTOR, within [min, max];
+      a missing or malformed value (e.g., the initial page render) starts at the minimum.
+    """
+    try:
+        last_delay_seconds: int = int(request.GET.get('delay', ''))
+    except ValueError:
+        last_delay_seconds = 0
+    if last_delay_seconds < min_delay_seconds:
+        next_delay_seconds: int = min_delay_seconds
+    else:
+        next_delay_seconds = min(int(last_delay_seconds * POLL_DELAY_GROWTH_FACTOR), POLL_MAX_DELAY_SECONDS)
+    log.debug('next poll delay, ``%s``', next_delay_seconds)
+    return next_delay_seconds
@@ -1,36 +1,113 @@
 """
-Synchronous image processing helpers with timeout fallback.
+Image processing helpers with timeout fallback.
 Handles OpenRouter processing attempts with graceful degradation.
+Attempts run on a background thread-pool, so the upload request returns without waiting on OpenRouter.
 
 Called by:
     - alt_text_app.views.upload_image()
+    - scripts/process_openrouter_summaries.py (claiming, stuck-processing recovery)
 """
 
 import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
 from django.conf import settings as project_settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
 from django.utils import timezone as django_timezone
 
-from alt_text_app.lib import image_helpers, openrouter_helpers
+from alt_text_app.lib import cache_helpers, image_helpers, openrouter_helpers
 from alt_text_app.models import ImageDocument, OpenRouterAltText
 
 log = logging.getLogger(__name__)
 
+## per-process pool; a job lost to a process restart leaves its document 'pending' (never started) or 'processing'
+##   (interrupted), and the cron script picks up both -- the latter once RECOVER_STUCK_PROCESSING_AFTER_SECONDS passes
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(
+    max_workers=project_settings.BACKGROUND_PROCESSING_MAX_WORKERS,
+    thread_name_prefix='alt_text_processing',
+)
+
+
+def queue_background_processing(doc_pk: int, image_path: Path) -> None:
+    """
+    Queues OpenRouter processing for the document on the background thread-pool.
+    """
+    log.debug('queueing background processing for document %s', doc_pk)
+    BACKGROUND_EXECUTOR.submit(run_background_processing, doc_pk, image_path)
+    return
+
+
+def run_background_processing(doc_pk: int, image_path: Path) -> None:
+    """
+    Runs attempt_synchronous_processing() on a pool thread.
+    Re-fetches the document by pk (model instances aren't shared across threads) and
+      closes this thread's stale db connections before and after.
+    The full-size image isn't read again after this, so its page cache is released afterwards.
+    Called by:
+        - queue_background_processing()
+    """
+    close_old_connections()
+    try:
+        doc = ImageDocument.objects.get(pk=doc_pk)
+        attempt_synchronous_processing(doc, image_path)
+    except Exception:
+        log.exception('background processing failed for document %s', doc_pk)
+    finally:
+        image_helpers.drop_file_page_cache(image_path)
+        close_old_connections()
+    return
+
+
+def build_stuck_processing_q(now: datetime.datetime) -> Q:
+    """
+    Returns a filter matching documents left in 'processing' longer than RECOVER_STUCK_PROCESSING_AFTER_SECONDS
+      (e.g., by a worker restart mid-job).
+    """
+    cutoff = now - datetime.timedelta(seconds=project_settings.RECOVER_STUCK_PROCESSING_AFTER_SECONDS)
+    stuck_q = Q(processing_status='processing') & (
+        Q(processing_started_at__lt=cutoff) | Q(processing_started_at__isnull=True)
+    )
+    return stuck_q
+
+
+def claim_document_for_processing(doc: ImageDocument, recover_stuck: bool = False) -> bool:
+    """
+    Moves the document to 'processing' in one conditional UPDATE; returns False if another worker got there first.
+    Only 'pending' documents are claimable, plus stuck 'processing' ones when `recover_stuck` is set, so the
+      background job and the cron script never both call OpenRouter for the same document.
+    Called by:
+        - attempt_synchronous_processing()
+        - scripts/process_openrouter_summaries.py
+    """
+    now = datetime.datetime.now()
+    claimable_q = Q(processing_status='pending')
+    if recover_stuck:
+        claimable_q |= build_stuck_processing_q(now)
+    claimed_count: int = ImageDocument.objects.filter(claimable_q, pk=doc.pk).update(
+        processing_status='processing', processing_error=None, processing_started_at=now
+    )
+    if claimed_count:
+        doc.processing_status = 'processing'
+        doc.processing_error = None
+        doc.processing_started_at = now
+    else:
+        log.info('document %s was already claimed; skipping', doc.pk)
+    return bool(claimed_count)
+
 
 def attempt_synchronous_processing(doc: ImageDocument, image_path: Path) -> None:
     """
     Attempts to run OpenRouter synchronously with timeouts.
     Updates doc status in-place. Falls back to 'pending' on timeout.
     """
-    log.debug(f'starting attempt_synchronous_processing() for document ``{doc.pk}')
-    ## Mark as processing and set timestamp
-    doc.processing_status = 'processing'
-    doc.processing_error = None
-    doc.processing_started_at = datetime.datetime.now()
-    doc.save(update_fields=['processing_status', 'processing_error', 'processing_started_at'])
+    log.debug('starting attempt_synchronous_processing() for document ``%s``', doc.pk)
+    ## Mark as processing, unless the cron script already has
+    if not claim_document_for_processing(doc):
+        return
     try:
         attempt_openrouter_sync(doc, image_path)
     except Exception as exc:
@@ -38,6 +115,8 @@ def attempt_synchronous_processing(doc: ImageDocument, image_path: Path) -> None
         doc.processing_status = 'failed'
         doc.processing_error = str(exc)
         doc.save(update_fields=['processing_status', 'processing_error'])
+    ## so the next poll shows the outcome, rather than a still-cached 'processing' fragment
+    cache_helpers.delete_status_fragment_html(doc.public_id)
 
 
 def attempt_openrouter_sync(doc: ImageDocument, image_path: Path) -> bool:
@@ -45,40 +124,36 @@ def attempt_openrouter_sync(doc: ImageDocument, image_path: Path) -> bool:
     Attempts synchronous OpenRouter alt-text generation with timeout.
     Returns True if successful, False if timeout or error.
     """
-    log.debug(f'starting attempt_openrouter_sync() for document ``{doc.pk}')
+    log.debug('starting attempt_openrouter_sync() for document ``%s``', doc.pk)
     api_key = openrouter_helpers.get_api_key()
     model_order = openrouter_helpers.get_model_order()
 
     if not api_key or not model_order:
         log.warning('OpenRouter credentials not available, skipping sync attempt for document %s', doc.pk)
+        ## hand the claimed document back to the cron script
+        doc.processing_status = 'pending'
+        doc.processing_started_at = None
+        doc.save(update_fields=['processing_status', 'processing_started_at'])
         return False
 
     timeout_seconds = project_settings.OPENROUTER_SYNC_TIMEOUT_SECONDS
 
-    ## Create alt-text record with 'processing' status BEFORE calling API
+    ## Build prompt first, so it's saved along with the initial status write
+    prompt = openrouter_helpers.build_prompt()
+
+    ## Create (or reset) alt-text record with 'processing' status BEFORE calling API;
+    ##   update_or_create() locks any existing row (SELECT ... FOR UPDATE) inside a transaction, then INSERTs or UPDATEs
     utc_now = datetime.datetime.now(tz=datetime.timezone.utc)
     naive_now = django_timezone.make_naive(utc_now)
-    alt_text_record, created = OpenRouterAltText.objects.get_or_create(
+    alt_text_record, _created = OpenRouterAltText.objects.update_or_create(
         image_document=doc,
-        defaults={'status': 'processing', 'requested_at': naive_now},
+        defaults={'status': 'processing', 'requested_at': naive_now, 'error': None, 'prompt': prompt},
     )
 
-    if not created:
-        alt_text_record.status = 'processing'
-        alt_text_record.requested_at = naive_now
-        alt_text_record.error = None
-        alt_text_record.save(update_fields=['status', 'requested_at', 'error'])
-
     try:
         log.info('Attempting synchronous OpenRouter for document %s', doc.pk)
 
-        prompt = openrouter_helpers.build_prompt()
-
-        ## Save prompt
-        alt_text_record.prompt = prompt
-        alt_text_record.save(update_fields=['prompt'])
-
-        image_data_url = image_helpers.build_image_data_url(image_path, doc.mime_type)
+        image_data_url = image_helpers.build_openrouter_image_url(doc.file_checksum, image_path, doc.mime_type)
 
         ## Call API with timeout
         response_json = openrouter_helpers.call_openrouter_with_model_order(
@@ -90,11 +165,12 @@ def attempt_openrouter_sync(doc: ImageDocument, image_path: Path) -> bool:
         )
         parsed = openrouter_helpers.parse_openrouter_response(response_json)
 
-        ## Persist
-        openrouter_helpers.persist_openrouter_alt_text(alt_text_record, response_json, parsed)
-        doc.processing_status = 'completed'
-        doc.processing_error = None
-        doc.save(update_fields=['processing_status', 'processing_error'])
+        ## Persist -- both rows' UPDATEs in one commit, so readers never see a completed record on an unfinished doc
+        with transaction.atomic():
+            openrouter_helpers.persist_openrouter_alt_text(alt_text_record, response_json, parsed)
+            doc.processing_status = 'completed'
+            doc.processing_error = None
+            doc.save(update_fields=['processing_status', 'processing_error'])
         log.info('Synchronous OpenRouter succeeded for document %s', doc.pk)
         return True
 
@@ -102,18 +178,20 @@ def attempt_openrouter_sync(doc: ImageDocument, image_path: Path) -> bool:
         log.warning('OpenRouter timed out for document %s, falling back to cron', doc.pk)
         alt_text_record.status = 'pending'
         alt_text_record.error = 'Sync attempt timed out; will retry in background.'
-        alt_text_record.save(update_fields=['status', 'error'])
         doc.processing_status = 'pending'
         doc.processing_started_at = None
-        doc.save(update_fields=['processing_status', 'processing_started_at'])
+        with transaction.atomic():
+            alt_text_record.save(update_fields=['status', 'error'])
+            doc.save(update_fields=['processing_status', 'processing_started_at'])
         return False
 
     except Exception as exc:
         log.exception('OpenRouter failed for document %s', doc.pk)
         alt_text_record.status = 'failed'
         alt_text_record.error = str(exc)
-        alt_text_record.save(update_fields=['status', 'error'])
         doc.processing_status = 'failed'
         doc.processing_error = str(exc)
-        doc.save(update_fields=['processing_status', 'processing_error'])
+        with transaction.atomic():
+            alt_text_record.save(update_fields=['status', 'error'])
+            doc.save(update_fields=['processing_status', 'processing_error'])
         return False
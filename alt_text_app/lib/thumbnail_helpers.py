@@ -4,19 +4,25 @@ Helpers for generating image thumbnails.
 
 import io
 import math
+import os
+import uuid
 import warnings
 from pathlib import Path
 
 from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError
 
+from alt_text_app.lib import image_helpers
+
 THUMBNAIL_MAX_HEIGHT_PX = 100
 THUMBNAIL_MAX_WIDTH_PX = 200
 THUMBNAIL_MAX_IMAGE_PIXELS = 80_000_000
 THUMBNAIL_WEBP_QUALITY = 80
-THUMBNAIL_WEBP_METHOD = 6
+THUMBNAIL_WEBP_METHOD = 4  # 6 costs ~3x the encode time for <1% smaller files at 200x100
 THUMBNAIL_SHARPEN_RADIUS = 1.0
 THUMBNAIL_SHARPEN_PERCENT = 100
 THUMBNAIL_SHARPEN_THRESHOLD = 3
+THUMBNAIL_REDUCING_GAP = 2.0
+THUMBNAIL_JPEG_DRAFT_FACTOR = 8  # JPEG draft-decoding keeps at least this multiple of the thumbnail size
 
 
 class ThumbnailError(Exception):
@@ -39,17 +45,30 @@ def generate_thumbnail_webp(image_path: Path) -> tuple[bytes, int, int]:
             with Image.open(image_path) as image:
                 if getattr(image, 'is_animated', False):
                     image.seek(0)
-                image = ImageOps.exif_transpose(image)
+                if image.format == 'JPEG':
+                    ## lets libjpeg decode at a reduced DCT scale (1/2, 1/4, 1/8) instead of full resolution
+                    image.draft(
+                        image.mode,
+                        (
+                            THUMBNAIL_MAX_WIDTH_PX * THUMBNAIL_JPEG_DRAFT_FACTOR,
+                            THUMBNAIL_MAX_HEIGHT_PX * THUMBNAIL_JPEG_DRAFT_FACTOR,
+                        ),
+                    )
+                ImageOps.exif_transpose(image, in_place=True)  # in place; avoids a full-image copy
                 original_width, original_height = image.size
                 resized = False
+                working = image  # nothing below mutates `image`, so no defensive copy is needed
                 if original_height > THUMBNAIL_MAX_HEIGHT_PX:
                     scale = THUMBNAIL_MAX_HEIGHT_PX / original_height
                     new_width = math.floor(original_width * scale)
                     new_height = THUMBNAIL_MAX_HEIGHT_PX
-                    working = image.resize((new_width, new_height), resample=Image.Resampling.LANCZOS)
+                    ## `reducing_gap` first shrinks by an integer factor with a fast box reduce, then finishes with LANCZOS
+                    working = image.resize(
+                        (new_width, new_height),
+                        resample=Image.Resampling.LANCZOS,
+                        reducing_gap=THUMBNAIL_REDUCING_GAP,
+                    )
                     resized = True
-                else:
-                    working = image.copy()
                 if working.width > THUMBNAIL_MAX_WIDTH_PX:
                     working = working.crop((0, 0, THUMBNAIL_MAX_WIDTH_PX, working.height))
                 if resized:
@@ -63,10 +82,9 @@ def generate_thumbnail_webp(image_path: Path) -> tuple[bytes, int, int]:
                 has_alpha = working.mode in ('RGBA', 'LA') or (
                     working.mode == 'P' and 'transparency' in working.info
                 )
-                if has_alpha:
-                    working = working.convert('RGBA')
-                else:
-                    working = working.convert('RGB')
+                target_mode = 'RGBA' if has_alpha else 'RGB'
+                if working.mode != target_mode:  # `convert()` to the same mode would just copy
+                    working = working.convert(target_mode)
                 width_px, height_px = working.size
                 output = io.BytesIO()
                 working.save(
@@ -81,3 +99,36 @@ def generate_thumbnail_webp(image_path: Path) -> tuple[bytes, int, int]:
     except OSError as exc:
         raise ThumbnailError(str(exc)) from exc
     return thumbnail_bytes, width_px, height_px
+
+
+def save_thumbnail_webp(checksum: str, thumbnail_bytes: bytes) -> Path:
+    """
+    Writes the thumbnail to its checksum-derived path, via a temporary file and atomic rename.
+    Called by:
+        - alt_text_app.views.upload_image()
+        - regenerate_thumbnail_webp()
+    """
+    thumbnail_path: Path = image_helpers.get_thumbnail_path(checksum)
+    thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path: Path = thumbnail_path.with_name(f'.{uuid.uuid4().hex}.part')
+    try:
+        temp_path.write_bytes(thumbnail_bytes)
+        os.replace(temp_path, thumbnail_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return thumbnail_path
+
+
+def regenerate_thumbnail_webp(checksum: str, extension: str) -> Path:
+    """
+    Rebuilds a missing thumbnail file from the stored original; raises ThumbnailError if the original can't be read.
+    Thumbnails once lived in a database column, so documents from before the move to disk have none on disk.
+    Called by:
+        - alt_text_app.views.image_preview()
+        - alt_text_app.management.commands.backfill_thumbnails
+    """
+    image_path: Path = image_helpers.get_image_path(checksum, extension)
+    thumbnail_bytes, _width_px, _height_px = generate_thumbnail_webp(image_path)
+    thumbnail_path: Path = save_thumbnail_webp(checksum, thumbnail_bytes)
+    return thumbnail_path
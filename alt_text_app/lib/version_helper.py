@@ -1,4 +1,5 @@
 import datetime
+import functools
 import logging
 import pathlib
 import pprint
@@ -34,6 +35,19 @@ def make_context(request, rq_now, info_txt):
     return context
 
 
+@functools.lru_cache(maxsize=1)
+def get_branch_and_commit() -> str:
+    """
+    Returns the `branch commit` text, gathered once per process; a deploy restarts the process, which refreshes it.
+    Called by:
+        - views.version()
+    """
+    gatherer = GatherCommitAndBranchData()
+    trio.run(gatherer.manage_git_calls)
+    info_txt: str = f'{gatherer.branch} {gatherer.commit}'
+    return info_txt
+
+
 class GatherCommitAndBranchData:
     """
     Note:
@@ -52,7 +66,7 @@ class GatherCommitAndBranchData:
         - Now it reads the `.git/HEAD` file to get both the commit and branch data (to avoid the `dubious ownership` issues),
           so it no longer benefits from asyncronous calls, but keeping for reference.
         Called by:
-            - views.version()
+            - get_branch_and_commit()
         """
         log.debug('manage_git_calls')
         results_holder_dct = {}  # receives git responses as they're produced
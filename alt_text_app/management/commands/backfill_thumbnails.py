@@ -0,0 +1,80 @@
+"""
+Writes thumbnail files for documents that record a thumbnail but have none on disk.
+
+Thumbnails used to be stored in the `ImageDocument.thumbnail_webp` column; they now live under
+  `IMAGE_UPLOAD_PATH/thumbnails/`. Rows from before that change keep `thumbnail_created_at`, so this rebuilds
+  each missing file from the stored original, rather than leaving the admin and report previews broken.
+
+Usage:
+    python manage.py backfill_thumbnails [--dry-run]
+
+Notes:
+- Safe to re-run; documents whose thumbnail file exists are skipped.
+- It doesn't read the old column, so it works before or after the migration that drops it.
+- `image_preview` also regenerates a missing file on demand, but not when IMAGE_SENDFILE_HEADER hands files to the
+  web server, so run this once after deploying.
+"""
+
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand
+
+from alt_text_app.lib import image_helpers, thumbnail_helpers
+from alt_text_app.models import ImageDocument
+
+
+class Command(BaseCommand):
+    """
+    Writes missing thumbnail files from the stored originals.
+    """
+
+    help = 'Regenerates thumbnail files missing from IMAGE_UPLOAD_PATH/thumbnails/'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Adds command-line arguments.
+
+        Called by: Django management command runner
+        """
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the missing thumbnails without writing them',
+        )
+
+    def handle(self, *args: object, **options: object) -> None:
+        """
+        Executes the command.
+
+        Called by: Django management command runner
+        """
+        dry_run = bool(options.get('dry_run'))
+        docs = (
+            ImageDocument.objects.filter(thumbnail_created_at__isnull=False)
+            .only('id', 'file_checksum', 'file_extension')
+            .order_by('id')
+        )
+        written_count = 0
+        failed_count = 0
+        for doc in docs.iterator():
+            if image_helpers.get_thumbnail_path(doc.file_checksum).exists():
+                continue
+            if dry_run:
+                self.stdout.write(f'Missing thumbnail for document {doc.pk}')
+                continue
+            try:
+                thumbnail_helpers.regenerate_thumbnail_webp(doc.file_checksum, doc.file_extension)
+            except thumbnail_helpers.ThumbnailError as exc:
+                failed_count += 1
+                self.stdout.write(self.style.ERROR(f'Could not regenerate thumbnail for document {doc.pk}: {exc}'))
+                continue
+            written_count += 1
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry run - not saving'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written_count} thumbnails; {failed_count} failed'))
+
+        ## end def handle()
+
+    ## end class Command()
@@ -1,25 +1,45 @@
+import os
+import time
 import uuid
+from decimal import Decimal
 
 from django.db import models
 
+## OpenRouterAltText.cost is stored in micro-USD
+MICRO_USD_PER_USD = 1_000_000
+
+
+def generate_uuid7() -> uuid.UUID:
+    """
+    Returns a time-ordered UUIDv7 (RFC 9562): a 48-bit unix-millisecond timestamp, then 74 random bits.
+    New values sort after older ones, so index inserts append instead of landing on random pages.
+    """
+    timestamp_ms: int = time.time_ns() // 1_000_000
+    random_bits: int = int.from_bytes(os.urandom(10), 'big')
+    value: int = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= ((random_bits >> 62) & 0xFFF) << 64  # rand_a
+    value |= 0b10 << 62  # variant
+    value |= random_bits & 0x3FFF_FFFF_FFFF_FFFF  # rand_b
+    return uuid.UUID(int=value)
+
 
 class ImageDocument(models.Model):
     """
     Stores uploaded image metadata and Shibboleth user info.
     """
 
-    ## Primary key
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ## Public identifier (used in urls; the primary key is the default BigAutoField, so inserts and joins stay compact)
+    public_id = models.UUIDField(default=generate_uuid7, unique=True, editable=False)
 
     ## File identification
     original_filename = models.CharField(max_length=255)
-    file_checksum = models.CharField(max_length=64, unique=True, db_index=True)  # SHA-256
+    file_checksum = models.CharField(max_length=64, unique=True)  # SHA-256 hex; `unique` already creates its index
     file_size = models.BigIntegerField()  # bytes
     mime_type = models.CharField(max_length=100)
     file_extension = models.CharField(max_length=10)
 
-    ## Thumbnail storage
-    thumbnail_webp = models.BinaryField(blank=True, null=True)
+    ## Thumbnail metadata (the webp file itself lives on disk; see image_helpers.get_thumbnail_path())
     thumbnail_created_at = models.DateTimeField(blank=True, null=True)
     thumbnail_error = models.TextField(blank=True, null=True)
     thumbnail_width_px = models.IntegerField(blank=True, null=True)
@@ -29,6 +49,7 @@ class ImageDocument(models.Model):
     user_first_name = models.CharField(max_length=100, blank=True)
     user_last_name = models.CharField(max_length=100, blank=True)
     user_email = models.EmailField(blank=True)
+    ## stays a JSONField (not postgres ArrayField + GinIndex): staging/production run mysql, and ci runs sqlite
     user_groups = models.JSONField(default=list, blank=True)  # List of groups
 
     ## Timestamps
@@ -51,8 +72,11 @@ class ImageDocument(models.Model):
     class Meta:
         ordering = ['-uploaded_at']
         indexes = [
-            models.Index(fields=['file_checksum']),
             models.Index(fields=['-uploaded_at']),
+            ## narrows the cron's `processing_status IN (...) ORDER BY uploaded_at LIMIT n` to the active rows; with two
+            ##   leading values the rows still need a sort, but only the small active set is read and sorted.
+            ##   Not partial, since mysql (staging/production) would skip a conditional index entirely
+            models.Index(fields=['processing_status', 'uploaded_at'], name='imagedoc_status_uploaded_idx'),
         ]
 
 
@@ -61,9 +85,6 @@ class OpenRouterAltText(models.Model):
     Stores OpenRouter alt-text results for an image.
     """
 
-    ## Primary key
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-
     ## Relationship
     image_document = models.OneToOneField(
         ImageDocument,
@@ -104,8 +125,16 @@ class OpenRouterAltText(models.Model):
     prompt_tokens = models.IntegerField(null=True, blank=True)
     completion_tokens = models.IntegerField(null=True, blank=True)
     total_tokens = models.IntegerField(null=True, blank=True)
-    cost = models.DecimalField(max_digits=10, decimal_places=6, null=True, blank=True)
+    ## integer micro-USD: a fixed 8-byte column, and plain int arithmetic when summing
+    cost = models.BigIntegerField(null=True, blank=True, help_text='cost in micro-USD')
 
     class Meta:
         verbose_name = 'OpenRouter Alt Text'
         verbose_name_plural = 'OpenRouter Alt Text'
+
+    @property
+    def cost_usd(self) -> Decimal | None:
+        """
+        Returns the cost in US dollars, for display.
+        """
+        return Decimal(self.cost) / MICRO_USD_PER_USD if self.cost is not None else None
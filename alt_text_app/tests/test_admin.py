@@ -0,0 +1,214 @@
+"""
+Tests for admin queryset tuning.
+"""
+
+import logging
+from unittest.mock import patch
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpRequest
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from alt_text_app.admin import ImageDocumentAdmin, OpenRouterAltTextAdmin
+from alt_text_app.lib.admin_helpers import FasterAdminPaginator
+from alt_text_app.models import ImageDocument, OpenRouterAltText
+
+log = logging.getLogger(__name__)
+TestCase.maxDiff = 1000
+
+
+class AdminQuerysetTest(TestCase):
+    """
+    Checks that admin querysets skip columns the changelist doesn't render.
+    """
+
+    def build_request(self, url_name: str, args: list[str] | None = None) -> HttpRequest:
+        """
+        Builds a GET request with its resolver_match populated, as the admin sees it.
+        """
+        url = reverse(url_name, args=args)
+        request = RequestFactory().get(url)
+        request.resolver_match = resolve(url)
+        return request
+
+    def test_image_document_changelist_selects_only_listed_fields(self) -> None:
+        """
+        Checks that the ImageDocument changelist queryset loads only the displayed columns.
+        """
+        model_admin = ImageDocumentAdmin(ImageDocument, admin.site)
+        request = self.build_request('admin:alt_text_app_imagedocument_changelist')
+        queryset = model_admin.get_queryset(request)
+        loaded_fields, is_defer = queryset.query.deferred_loading
+        self.assertFalse(is_defer)
+        self.assertEqual(
+            {
+                'id',
+                'original_filename',
+                'user_email',
+                'file_size',
+                'processing_status',
+                'uploaded_at',
+                'openrouter_alt_text__id',
+                'openrouter_alt_text__status',
+            },
+            set(loaded_fields),
+        )
+
+    def test_image_document_change_view_loads_all_fields(self) -> None:
+        """
+        Checks that the ImageDocument change-view queryset isn't restricted.
+        """
+        model_admin = ImageDocumentAdmin(ImageDocument, admin.site)
+        request = self.build_request('admin:alt_text_app_imagedocument_add')
+        queryset = model_admin.get_queryset(request)
+        self.assertEqual((frozenset(), True), queryset.query.deferred_loading)
+
+    def test_alt_text_changelist_selects_only_listed_fields(self) -> None:
+        """
+        Checks that the OpenRouterAltText changelist queryset skips large fields and joins the document.
+        """
+        model_admin = OpenRouterAltTextAdmin(OpenRouterAltText, admin.site)
+        request = self.build_request('admin:alt_text_app_openrouteralttext_changelist')
+        queryset = model_admin.get_queryset(request)
+        loaded_fields, is_defer = queryset.query.deferred_loading
+        self.assertFalse(is_defer)
+        for large_field in ('raw_response_json', 'alt_text', 'prompt'):
+            self.assertNotIn(large_field, loaded_fields)
+        self.assertIn('image_document__original_filename', loaded_fields)
+        self.assertEqual({'image_document': {}}, queryset.query.select_related)
+
+
+class FasterAdminPaginatorTest(TestCase):
+    """
+    Checks FasterAdminPaginator counting.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """
+        Creates a couple of documents to count.
+        """
+        for index in range(2):
+            ImageDocument.objects.create(
+                original_filename=f'test_{index}.png',
+                file_checksum=f'test_checksum_paginator_{index}',
+                file_size=1024,
+                mime_type='image/png',
+                file_extension='png',
+                processing_status='completed' if index else 'pending',
+            )
+
+    def test_count_exact_without_estimate(self) -> None:
+        """
+        Checks that an unfiltered queryset falls back to an exact count when no estimate is available.
+        """
+        paginator = FasterAdminPaginator(ImageDocument.objects.all(), 100)
+        with patch('alt_text_app.lib.admin_helpers.get_table_row_estimate', return_value=0):
+            self.assertEqual(2, paginator.count)
+
+    def test_count_uses_large_estimate_when_unfiltered(self) -> None:
+        """
+        Checks that an unfiltered queryset uses a large table estimate instead of COUNT(*).
+        """
+        paginator = FasterAdminPaginator(ImageDocument.objects.all(), 100)
+        with patch('alt_text_app.lib.admin_helpers.get_table_row_estimate', return_value=50_000):
+            self.assertEqual(50_000, paginator.count)
+
+    def test_count_exact_when_filtered(self) -> None:
+        """
+        Checks that a filtered queryset always gets an exact count.
+        """
+        paginator = FasterAdminPaginator(ImageDocument.objects.filter(processing_status='pending'), 100)
+        with patch('alt_text_app.lib.admin_helpers.get_table_row_estimate', return_value=50_000) as mock_estimate:
+            self.assertEqual(1, paginator.count)
+        mock_estimate.assert_not_called()
+
+
+class AdminChangelistTest(TestCase):
+    """
+    Checks that the admin changelists render with the tuned querysets.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """
+        Creates an admin user and a document with alt text.
+        """
+        user_model = get_user_model()
+        cls.admin_user = user_model.objects.create_superuser('admin_test', 'admin_test@example.com', 'password')
+        cls.document = ImageDocument.objects.create(
+            original_filename='changelist.png',
+            file_checksum='test_checksum_changelist',
+            file_size=1024,
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='completed',
+        )
+        OpenRouterAltText.objects.create(
+            image_document=cls.document,
+            status='completed',
+            alt_text='A changelist test.',
+            model='test-model',
+        )
+
+    def setUp(self) -> None:
+        """
+        Logs in the admin user.
+        """
+        self.client.force_login(self.admin_user)
+
+    def test_image_document_changelist_renders(self) -> None:
+        """
+        Checks that the ImageDocument changelist renders its rows.
+        """
+        response = self.client.get(reverse('admin:alt_text_app_imagedocument_changelist'))
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'changelist.png')
+
+    def test_image_document_changelist_joins_alt_text_status(self) -> None:
+        """
+        Checks that the alt-text status column is loaded by the page query rather than once per row.
+        """
+        for index in range(3):
+            extra_document = ImageDocument.objects.create(
+                original_filename=f'extra_{index}.png',
+                file_checksum=f'test_checksum_changelist_{index}',
+                file_size=1024,
+                mime_type='image/png',
+                file_extension='png',
+                processing_status='completed',
+            )
+            OpenRouterAltText.objects.create(image_document=extra_document, status='completed')
+        url = reverse('admin:alt_text_app_imagedocument_changelist')
+        self.client.get(url)  # warms the session/auth queries
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        alt_text_queries = [
+            query['sql'] for query in captured.captured_queries if 'FROM "alt_text_app_openrouteralttext"' in query['sql']
+        ]
+        self.assertEqual([], alt_text_queries)
+        self.assertContains(response, 'Alt text status')
+
+    def test_alt_text_changelist_renders(self) -> None:
+        """
+        Checks that the OpenRouterAltText changelist renders its rows.
+        """
+        response = self.client.get(reverse('admin:alt_text_app_openrouteralttext_changelist'))
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'test-model')
+
+    def test_image_document_changelist_bulk_delete(self) -> None:
+        """
+        Checks that the "Delete selected" action removes the selected documents and their alt text.
+        """
+        response = self.client.post(
+            reverse('admin:alt_text_app_imagedocument_changelist'),
+            {'action': 'delete_selected', '_selected_action': [str(self.document.pk)], 'post': 'yes'},
+        )
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(ImageDocument.objects.filter(pk=self.document.pk).exists())
+        self.assertFalse(OpenRouterAltText.objects.filter(image_document_id=self.document.pk).exists())
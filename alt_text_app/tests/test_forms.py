@@ -0,0 +1,41 @@
+"""
+Tests for the image upload form.
+"""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase as TestCase
+
+from alt_text_app.forms import ImageUploadForm
+
+
+class ImageUploadFormTest(TestCase):
+    """
+    Checks ImageUploadForm magic-byte validation.
+    """
+
+    def test_recognized_signatures_are_valid(self) -> None:
+        """
+        Checks that files starting with a supported image signature pass validation.
+        """
+        headers: dict[str, bytes] = {
+            'test.png': b'\x89PNG\r\n\x1a\n',
+            'test.jpg': b'\xff\xd8\xff\xe0',
+            'test.gif': b'GIF89a',
+            'test.webp': b'RIFF\x00\x00\x00\x00WEBPVP8 ',
+            'test.tiff': b'MM\x00*',
+        }
+        for filename, header in headers.items():
+            with self.subTest(filename=filename):
+                upload = SimpleUploadedFile(filename, header + b'\x00' * 32)
+                form = ImageUploadForm(files={'image_file': upload})
+                form.is_valid()
+                self.assertNotIn('File must be a valid image.', form.errors.get('image_file', []))
+
+    def test_unrecognized_signature_is_invalid(self) -> None:
+        """
+        Checks that a file with an image extension but non-image bytes fails validation.
+        """
+        upload = SimpleUploadedFile('test.png', b'not really an image')
+        form = ImageUploadForm(files={'image_file': upload})
+        self.assertFalse(form.is_valid())
+        self.assertIn('File must be a valid image.', form.errors['image_file'])
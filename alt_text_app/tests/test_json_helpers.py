@@ -0,0 +1,59 @@
+"""
+Tests for json response serialization.
+"""
+
+import json
+import logging
+
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from alt_text_app.lib import json_helpers
+
+log = logging.getLogger(__name__)
+
+
+class BuildJsonOutputTest(SimpleTestCase):
+    """
+    Checks build_json_output() formatting.
+    """
+
+    def test_compact_by_default_with_sorted_keys(self) -> None:
+        """
+        Checks that the default output is compact and key-sorted.
+        """
+        request = RequestFactory().get('/version/')
+        output = json_helpers.build_json_output({'b': 1, 'a': {'d': 2, 'c': 3}}, request)
+        self.assertEqual('{"a":{"c":3,"d":2},"b":1}', output)
+
+    def test_pretty_param_indents(self) -> None:
+        """
+        Checks that `?pretty=1` returns indented, key-sorted output.
+        """
+        request = RequestFactory().get('/version/', {'pretty': '1'})
+        output = json_helpers.build_json_output({'b': 1, 'a': 2}, request)
+        self.assertEqual('{\n  "a": 2,\n  "b": 1\n}', output)
+
+
+class JsonViewsTest(TestCase):
+    """
+    Checks the json modes of the info and version views.
+    """
+
+    def test_version_compact_and_pretty(self) -> None:
+        """
+        Checks that the version view serves compact json by default and indented json with `?pretty=1`.
+        """
+        compact_response = self.client.get(reverse('version_url'))
+        pretty_response = self.client.get(reverse('version_url'), {'pretty': '1'})
+        self.assertNotIn(b'\n', compact_response.content)
+        self.assertIn(b'\n  "request": {', pretty_response.content)
+        self.assertEqual(json.loads(compact_response.content).keys(), json.loads(pretty_response.content).keys())
+
+    def test_info_json_pretty(self) -> None:
+        """
+        Checks that the info view's json format honors `&pretty=1`.
+        """
+        response = self.client.get(reverse('info_url'), {'format': 'json', 'pretty': '1'})
+        self.assertEqual('application/json; charset=utf-8', response['Content-Type'])
+        self.assertTrue(response.content.startswith(b'{\n  "foo": "bar",'))
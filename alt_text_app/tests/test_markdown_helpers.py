@@ -22,3 +22,13 @@ class MarkdownHelpersTest(TestCase):
         """
         html = markdown_helpers.load_markdown_from_lib('info.md')
         self.assertIn('the experimental Image Alt-Text Maker', html)
+
+    def test_load_markdown_from_lib_is_cached(self) -> None:
+        """
+        Checks load_markdown_from_lib() renders a lib file once and reuses the result.
+        """
+        markdown_helpers.load_markdown_from_lib.cache_clear()
+        first_html = markdown_helpers.load_markdown_from_lib('info.md')
+        second_html = markdown_helpers.load_markdown_from_lib('info.md')
+        self.assertIs(first_html, second_html)
+        self.assertEqual(1, markdown_helpers.load_markdown_from_lib.cache_info().misses)
@@ -0,0 +1,59 @@
+"""
+Tests for model helpers.
+"""
+
+import logging
+import time
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase as TestCase
+
+from alt_text_app.models import OpenRouterAltText, generate_uuid7
+
+log = logging.getLogger(__name__)
+
+
+class GenerateUuid7Test(TestCase):
+    """
+    Checks generate_uuid7() output.
+    """
+
+    def test_version_and_variant(self) -> None:
+        """
+        Checks that generated values are RFC 9562 version-7 UUIDs.
+        """
+        value = generate_uuid7()
+        self.assertEqual(7, value.version)
+        self.assertEqual(uuid.RFC_4122, value.variant)
+
+    def test_embeds_current_timestamp(self) -> None:
+        """
+        Checks that the leading 48 bits hold the current unix-millisecond time.
+        """
+        before_ms = time.time_ns() // 1_000_000
+        value = generate_uuid7()
+        after_ms = time.time_ns() // 1_000_000
+        self.assertTrue(before_ms <= value.int >> 80 <= after_ms)
+
+    def test_values_sort_by_creation_time(self) -> None:
+        """
+        Checks that a later value sorts after an earlier one.
+        """
+        first = generate_uuid7()
+        time.sleep(0.002)
+        second = generate_uuid7()
+        self.assertLess(first, second)
+
+
+class OpenRouterAltTextCostTest(TestCase):
+    """
+    Checks the micro-USD cost conversion.
+    """
+
+    def test_cost_usd_converts_micro_usd(self) -> None:
+        """
+        Checks that cost_usd returns dollars, and None when no cost was recorded.
+        """
+        self.assertEqual(Decimal('0.001234'), OpenRouterAltText(cost=1234).cost_usd)
+        self.assertIsNone(OpenRouterAltText(cost=None).cost_usd)
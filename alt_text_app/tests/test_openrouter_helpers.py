@@ -0,0 +1,106 @@
+"""
+Tests for OpenRouter helper functions.
+"""
+
+import logging
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase as TestCase
+
+from alt_text_app.lib import openrouter_helpers
+
+log = logging.getLogger(__name__)
+TestCase.maxDiff = 1000
+
+
+def fake_call_openrouter(prompt: str, api_key: str, model: str, timeout_seconds: float, image_data_url: str) -> dict:
+    """
+    Stands in for call_openrouter(); behavior is keyed on the model name.
+    """
+    if model.startswith('failing'):
+        raise ValueError(f'{model} failed')
+    if model.startswith('slow'):
+        time.sleep(0.5)
+    return {'model': model}
+
+
+class CallOpenRouterWithModelOrderTest(TestCase):
+    """
+    Checks hedged model-fallback behavior of call_openrouter_with_model_order().
+    """
+
+    def call_with_models(self, model_order: list[str], timeout_seconds: float = 10.0) -> dict:
+        """
+        Calls call_openrouter_with_model_order() with call_openrouter() replaced by the fake.
+        """
+        with patch('alt_text_app.lib.openrouter_helpers.call_openrouter', side_effect=fake_call_openrouter) as mock_call:
+            response_json = openrouter_helpers.call_openrouter_with_model_order(
+                'prompt', 'key', model_order, timeout_seconds, 'data:image/png;base64,'
+            )
+        self.called_models = [call.args[2] for call in mock_call.call_args_list]
+        return response_json
+
+    def test_first_model_success_skips_others(self) -> None:
+        """
+        Checks that a fast successful first model is used without starting the next model.
+        """
+        response_json = self.call_with_models(['model-one', 'model-two'])
+        self.assertEqual({'model': 'model-one'}, response_json)
+        self.assertEqual(['model-one'], self.called_models)
+
+    def test_failed_model_falls_back_to_next(self) -> None:
+        """
+        Checks that a failing model immediately falls back to the next model.
+        """
+        response_json = self.call_with_models(['failing-one', 'model-two'])
+        self.assertEqual({'model': 'model-two'}, response_json)
+        self.assertEqual(['failing-one', 'model-two'], self.called_models)
+
+    def test_slow_model_is_hedged(self) -> None:
+        """
+        Checks that the next model is started when the first is slow, and the first success wins.
+        """
+        response_json = self.call_with_models(['slow-one', 'model-two'], timeout_seconds=0.1)
+        self.assertEqual({'model': 'model-two'}, response_json)
+
+    def test_all_models_fail_raises_last_error(self) -> None:
+        """
+        Checks that the last model's exception is raised when every model fails.
+        """
+        with self.assertRaisesRegex(ValueError, 'failing-two failed'):
+            self.call_with_models(['failing-one', 'failing-two'])
+
+
+class GetHttpClientTest(TestCase):
+    """
+    Checks the shared OpenRouter http client.
+    """
+
+    def test_client_is_reused(self) -> None:
+        """
+        Checks that repeated calls return the same pooled client.
+        """
+        self.assertIs(openrouter_helpers.get_http_client(), openrouter_helpers.get_http_client())
+
+
+class ParseOpenRouterResponseTest(TestCase):
+    """
+    Checks parse_openrouter_response() usage parsing.
+    """
+
+    def test_cost_is_stored_as_micro_usd(self) -> None:
+        """
+        Checks that the dollar cost in `usage` is converted to integer micro-USD.
+        """
+        parsed = openrouter_helpers.parse_openrouter_response(
+            {'usage': {'prompt_tokens': 10, 'completion_tokens': 20, 'total_tokens': 30, 'cost': 0.000123}}
+        )
+        self.assertEqual(123, parsed['cost'])
+
+    def test_missing_cost_is_none(self) -> None:
+        """
+        Checks that a response without a usage cost leaves the cost empty.
+        """
+        parsed = openrouter_helpers.parse_openrouter_response({'usage': {'total_tokens': 30}})
+        self.assertIsNone(parsed['cost'])
@@ -1,8 +1,10 @@
+import base64
+import hashlib
 import logging
 import tempfile
 from pathlib import Path
 
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
 from django.test import SimpleTestCase as TestCase
 from django.test.utils import override_settings
 
@@ -12,24 +14,44 @@ log = logging.getLogger(__name__)
 TestCase.maxDiff = 1000
 
 
-class ImageHelperSaveFileTest(TestCase):
+class ImageHelperStreamUploadTest(TestCase):
     """
-    Checks save_image_file storage.
+    Checks stream_upload_to_disk single-pass save + checksum.
     """
 
-    def test_save_image_file_uses_image_upload_path(self) -> None:
+    def test_stream_upload_to_disk_saves_checksum_named_file(self) -> None:
         """
-        Checks that save_image_file writes into IMAGE_UPLOAD_PATH.
+        Checks that stream_upload_to_disk writes `{checksum}.{extension}` and returns the matching checksum.
         """
         content: bytes = b'\x89PNG\r\n\x1a\nimage'
-        upload = SimpleUploadedFile('test.png', content, content_type='image/png')
+        upload = SimpleUploadedFile('test.PNG', content, content_type='image/png')
+        expected_checksum: str = hashlib.sha256(content).hexdigest()
         with tempfile.TemporaryDirectory() as temp_dir:
             with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
-                saved_path = image_helpers.save_image_file(upload, 'test_checksum_123', 'png')
-                log.debug(f'saved_path, ``{saved_path}``')
-                self.assertEqual(Path(temp_dir).resolve(), saved_path.parent)
-                self.assertTrue(saved_path.exists())
+                saved_path, checksum = image_helpers.stream_upload_to_disk(upload, 'PNG')
+                self.assertEqual(expected_checksum, checksum)
+                self.assertEqual(Path(temp_dir).resolve() / f'{expected_checksum}.png', saved_path)
                 self.assertEqual(content, saved_path.read_bytes())
+                self.assertEqual([saved_path.name], [path.name for path in Path(temp_dir).iterdir()])
+
+    def test_stream_upload_to_disk_temporary_upload(self) -> None:
+        """
+        Checks that stream_upload_to_disk hashes and copies an on-disk (temporary-file) upload.
+        """
+        content: bytes = b'\x89PNG\r\n\x1a\n' + b't' * 5000
+        upload = TemporaryUploadedFile('test.png', 'image/png', len(content), None)
+        upload.write(content)
+        upload.flush()
+        expected_checksum: str = hashlib.sha256(content).hexdigest()
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
+                    saved_path, checksum = image_helpers.stream_upload_to_disk(upload, 'png')
+                    self.assertEqual(expected_checksum, checksum)
+                    self.assertEqual(content, saved_path.read_bytes())
+                    self.assertEqual([saved_path.name], [path.name for path in Path(temp_dir).iterdir()])
+        finally:
+            upload.close()
 
 
 class ImageHelperPathTest(TestCase):
@@ -45,3 +67,69 @@ class ImageHelperPathTest(TestCase):
             with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
                 image_path = image_helpers.get_image_path('abc123', 'JPG')
                 self.assertEqual(Path(temp_dir).resolve() / 'abc123.jpg', image_path)
+
+    def test_get_upload_dir_path_follows_overridden_setting(self) -> None:
+        """
+        Checks that the cached upload directory is cleared when IMAGE_UPLOAD_PATH is overridden.
+        """
+        with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+            with override_settings(IMAGE_UPLOAD_PATH=first_dir):
+                self.assertEqual(Path(first_dir).resolve(), image_helpers.get_upload_dir_path())
+            with override_settings(IMAGE_UPLOAD_PATH=second_dir):
+                self.assertEqual(Path(second_dir).resolve(), image_helpers.get_upload_dir_path())
+
+
+class ImageHelperDataUrlTest(TestCase):
+    """
+    Checks build_image_data_url encoding.
+    """
+
+    def test_build_image_data_url_matches_single_pass_encoding(self) -> None:
+        """
+        Checks that chunked encoding of a multi-chunk file matches encoding the whole file at once.
+        """
+        content: bytes = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4000
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = Path(temp_dir) / 'test.png'
+            image_path.write_bytes(content)
+            data_url = image_helpers.build_image_data_url(image_path, 'image/png')
+        expected = f'data:image/png;base64,{base64.b64encode(content).decode("ascii")}'
+        self.assertEqual(expected, data_url)
+
+    def test_build_image_data_url_defaults_mime_type(self) -> None:
+        """
+        Checks that a missing mime type falls back to image/*.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = Path(temp_dir) / 'test.png'
+            image_path.write_bytes(b'abc')
+            data_url = image_helpers.build_image_data_url(image_path, '')
+        self.assertEqual('data:image/*;base64,YWJj', data_url)
+
+    def test_build_image_data_url_empty_file(self) -> None:
+        """
+        Checks that an empty file encodes to an empty data-url payload.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = Path(temp_dir) / 'empty.png'
+            image_path.write_bytes(b'')
+            data_url = image_helpers.build_image_data_url(image_path, 'image/png')
+        self.assertEqual('data:image/png;base64,', data_url)
+
+
+class ImageHelperPageCacheTest(TestCase):
+    """
+    Checks the page-cache release helper.
+    """
+
+    def test_drop_file_page_cache_tolerates_missing_file(self) -> None:
+        """
+        Checks that dropping the page cache for an existing or missing file doesn't raise.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = Path(temp_dir) / 'abc123.png'
+            image_path.write_bytes(b'image-bytes')
+            image_helpers.drop_file_page_cache(image_path)
+            image_path.unlink()
+            image_helpers.drop_file_page_cache(image_path)
+        self.assertFalse(image_path.exists())
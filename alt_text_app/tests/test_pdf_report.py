@@ -1,12 +1,18 @@
+import datetime
 import io
 import logging
+import tempfile
 import uuid
 
 from PIL import Image
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
-from alt_text_app.models import ImageDocument
+from alt_text_app.lib import image_helpers, thumbnail_helpers
+from alt_text_app.models import ImageDocument, OpenRouterAltText
 
 log = logging.getLogger(__name__)
 TestCase.maxDiff = 1000
@@ -17,13 +23,14 @@ class ImageReportTest(TestCase):
     Checks image report functionality with UUID endpoints.
     """
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpTestData(cls) -> None:
         """
         Sets up test data with UUID-based ImageDocument.
         """
-        self.test_uuid = uuid.uuid4()
-        self.document = ImageDocument.objects.create(
-            id=self.test_uuid,
+        cls.test_uuid = uuid.uuid4()
+        cls.document = ImageDocument.objects.create(
+            public_id=cls.test_uuid,
             original_filename='test.png',
             file_checksum='test_checksum_123',
             file_size=1024,
@@ -36,23 +43,52 @@ class ImageReportTest(TestCase):
             processing_status='completed',
         )
 
+    def store_thumbnail(self) -> None:
+        """
+        Writes a thumbnail for the test document into a temporary IMAGE_UPLOAD_PATH.
+        """
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        settings_override = override_settings(IMAGE_UPLOAD_PATH=temp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        thumbnail_stream = io.BytesIO()
+        with Image.new('RGB', (10, 10), color='blue') as image:
+            image.save(thumbnail_stream, format='WEBP')
+        thumbnail_helpers.save_thumbnail_webp(self.document.file_checksum, thumbnail_stream.getvalue())
+        self.document.thumbnail_created_at = datetime.datetime.now()
+        self.document.save(update_fields=['thumbnail_created_at'])
+
     def test_image_report_url_with_valid_uuid(self) -> None:
         """
         Checks that image report URL works with valid UUID.
         """
         log.debug(f'testing with UUID: {self.test_uuid}')
-        url = reverse('image_report_url', kwargs={'pk': self.test_uuid})
+        url = reverse('image_report_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'test.png')
 
+    def test_image_report_loads_alt_text_in_one_query(self) -> None:
+        """
+        Checks that the report page loads the document and its alt text with a single, narrow query.
+        """
+        OpenRouterAltText.objects.create(image_document=self.document, status='completed', alt_text='A blue square.')
+        url = reverse('image_report_url', kwargs={'public_id': self.test_uuid})
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(1, len(captured.captured_queries))
+        self.assertContains(response, 'A blue square.')
+        for column in ('raw_response_json', 'prompt', 'user_groups', 'processing_error'):
+            self.assertNotIn(column, captured.captured_queries[0]['sql'])
+
     def test_image_report_url_with_invalid_uuid(self) -> None:
         """
         Checks that image report URL returns 404 for invalid UUID.
         """
         invalid_uuid = uuid.uuid4()
         log.debug(f'testing with invalid UUID: {invalid_uuid}')
-        url = reverse('image_report_url', kwargs={'pk': invalid_uuid})
+        url = reverse('image_report_url', kwargs={'public_id': invalid_uuid})
         response = self.client.get(url)
         self.assertEqual(404, response.status_code)
 
@@ -68,20 +104,117 @@ class ImageReportTest(TestCase):
         """
         Checks that image preview URL streams the stored thumbnail.
         """
-        thumbnail_stream = io.BytesIO()
-        with Image.new('RGB', (10, 10), color='blue') as image:
-            image.save(thumbnail_stream, format='WEBP')
-        self.document.thumbnail_webp = thumbnail_stream.getvalue()
-        self.document.save(update_fields=['thumbnail_webp'])
-        url = reverse('image_preview_url', kwargs={'pk': self.test_uuid})
+        self.store_thumbnail()
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertEqual('image/webp', response['Content-Type'])
 
+    def test_image_preview_url_sets_cache_headers(self) -> None:
+        """
+        Checks that image preview URL lets the browser cache the thumbnail.
+        """
+        self.store_thumbnail()
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+        response = self.client.get(url)
+        self.assertEqual('private, max-age=31536000, immutable', response['Cache-Control'])
+        self.assertEqual('"test_checksum_123"', response['ETag'])
+        self.assertTrue(int(response['Content-Length']) > 0)
+
+    def test_image_preview_url_returns_304_for_matching_etag(self) -> None:
+        """
+        Checks that image preview URL skips the body when the browser already has the thumbnail.
+        """
+        self.store_thumbnail()
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+        response = self.client.get(url, headers={'If-None-Match': '"test_checksum_123"'})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+        self.assertEqual('"test_checksum_123"', response['ETag'])
+
+    def test_image_preview_url_returns_304_for_if_modified_since(self) -> None:
+        """
+        Checks that image preview URL sends Last-Modified and honors If-Modified-Since when there's no etag to compare.
+        """
+        self.store_thumbnail()
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+        first_response = self.client.get(url)
+        last_modified = first_response['Last-Modified']
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(last_modified, response['Last-Modified'])
+        stale_response = self.client.get(url, headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+        self.assertEqual(200, stale_response.status_code)
+
+    def test_image_preview_url_delegates_to_x_sendfile(self) -> None:
+        """
+        Checks that image preview URL hands the thumbnail's path to the web server when X-Sendfile is configured.
+        """
+        self.store_thumbnail()
+        with override_settings(IMAGE_SENDFILE_HEADER='X-Sendfile'):
+            url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+            response = self.client.get(url)
+            expected_path = image_helpers.get_thumbnail_path('test_checksum_123')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(str(expected_path), response['X-Sendfile'])
+        self.assertEqual(b'', response.content)
+
+    def test_image_preview_url_delegates_to_x_accel_redirect(self) -> None:
+        """
+        Checks that image preview URL points nginx at the internal location when X-Accel-Redirect is configured.
+        """
+        self.store_thumbnail()
+        with override_settings(IMAGE_SENDFILE_HEADER='X-Accel-Redirect', IMAGE_SENDFILE_ACCEL_ROOT='/internal_images/'):
+            url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+            response = self.client.get(url)
+        self.assertEqual('/internal_images/thumbnails/test_checksum_123.webp', response['X-Accel-Redirect'])
+        self.assertEqual('image/webp', response['Content-Type'])
+
     def test_image_preview_url_missing_file(self) -> None:
         """
         Checks that image preview URL returns 404 when thumbnail is missing.
         """
-        url = reverse('image_preview_url', kwargs={'pk': self.test_uuid})
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+        response = self.client.get(url)
+        self.assertEqual(404, response.status_code)
+
+    def test_image_preview_url_thumbnail_file_deleted(self) -> None:
+        """
+        Checks that image preview URL returns 404 when the thumbnail is recorded but its file is gone.
+        """
+        self.store_thumbnail()
+        image_helpers.get_thumbnail_path(self.document.file_checksum).unlink()
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(404, response.status_code)
+
+    def test_image_preview_url_regenerates_deleted_thumbnail(self) -> None:
+        """
+        Checks that image preview URL rebuilds a recorded-but-missing thumbnail from the stored original.
+        """
+        self.store_thumbnail()
+        thumbnail_path = image_helpers.get_thumbnail_path(self.document.file_checksum)
+        thumbnail_path.unlink()
+        with Image.new('RGB', (300, 300), color='red') as image:
+            image.save(image_helpers.get_image_path(self.document.file_checksum, 'png'), format='PNG')
+        url = reverse('image_preview_url', kwargs={'public_id': self.test_uuid})
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('image/webp', response['Content-Type'])
+        self.assertTrue(thumbnail_path.exists())
+
+    def test_backfill_thumbnails_writes_missing_files(self) -> None:
+        """
+        Checks that the backfill command rebuilds missing thumbnails and leaves existing ones alone.
+        """
+        self.store_thumbnail()
+        thumbnail_path = image_helpers.get_thumbnail_path(self.document.file_checksum)
+        thumbnail_path.unlink()
+        with Image.new('RGB', (300, 300), color='red') as image:
+            image.save(image_helpers.get_image_path(self.document.file_checksum, 'png'), format='PNG')
+        output = io.StringIO()
+        call_command('backfill_thumbnails', '--dry-run', stdout=output)
+        self.assertFalse(thumbnail_path.exists())
+        call_command('backfill_thumbnails', stdout=output)
+        self.assertTrue(thumbnail_path.exists())
+        self.assertIn('Wrote 1 thumbnails; 0 failed', output.getvalue())
@@ -5,9 +5,13 @@ Tests for htmx polling fragment endpoints.
 import logging
 import uuid
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
+from alt_text_app.lib import cache_helpers, polling_helpers
 from alt_text_app.models import ImageDocument, OpenRouterAltText
 
 log = logging.getLogger(__name__)
@@ -19,13 +23,14 @@ class StatusFragmentTest(TestCase):
     Checks status fragment endpoint behavior.
     """
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpTestData(cls) -> None:
         """
         Sets up test data.
         """
-        self.test_uuid = uuid.uuid4()
-        self.document = ImageDocument.objects.create(
-            id=self.test_uuid,
+        cls.test_uuid = uuid.uuid4()
+        cls.document = ImageDocument.objects.create(
+            public_id=cls.test_uuid,
             original_filename='test.png',
             file_checksum='test_checksum_status',
             file_size=1024,
@@ -38,7 +43,7 @@ class StatusFragmentTest(TestCase):
         """
         Checks that status fragment returns polling attributes for pending status.
         """
-        url = reverse('status_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'hx-get')
@@ -51,7 +56,7 @@ class StatusFragmentTest(TestCase):
         """
         self.document.processing_status = 'processing'
         self.document.save()
-        url = reverse('status_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'hx-get')
@@ -63,7 +68,7 @@ class StatusFragmentTest(TestCase):
         """
         self.document.processing_status = 'completed'
         self.document.save()
-        url = reverse('status_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'Processing complete')
@@ -75,18 +80,27 @@ class StatusFragmentTest(TestCase):
         """
         self.document.processing_status = 'failed'
         self.document.save()
-        url = reverse('status_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'Processing failed')
         self.assertNotContains(response, 'hx-trigger="every')
 
+    def test_status_fragment_backs_off_between_polls(self) -> None:
+        """
+        Checks that each poll's fragment schedules the next poll with a longer delay.
+        """
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
+        response = self.client.get(url, {'delay': '2'})
+        self.assertContains(response, 'hx-trigger="every 3s"')
+        self.assertContains(response, f'{url}?delay=3')
+
     def test_status_fragment_invalid_uuid(self) -> None:
         """
         Checks that status fragment returns 404 for invalid UUID.
         """
         invalid_uuid = uuid.uuid4()
-        url = reverse('status_fragment_url', kwargs={'pk': invalid_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': invalid_uuid})
         response = self.client.get(url)
         self.assertEqual(404, response.status_code)
 
@@ -94,7 +108,7 @@ class StatusFragmentTest(TestCase):
         """
         Checks that status fragment sets Cache-Control header.
         """
-        url = reverse('status_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual('no-store', response['Cache-Control'])
 
@@ -104,13 +118,14 @@ class AltTextFragmentTest(TestCase):
     Checks alt-text fragment endpoint behavior.
     """
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpTestData(cls) -> None:
         """
         Sets up test data.
         """
-        self.test_uuid = uuid.uuid4()
-        self.document = ImageDocument.objects.create(
-            id=self.test_uuid,
+        cls.test_uuid = uuid.uuid4()
+        cls.document = ImageDocument.objects.create(
+            public_id=cls.test_uuid,
             original_filename='test.png',
             file_checksum='test_checksum_alt_text',
             file_size=1024,
@@ -123,8 +138,9 @@ class AltTextFragmentTest(TestCase):
         """
         Checks that alt-text fragment handles missing alt text gracefully.
         """
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
-        response = self.client.get(url)
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'Alt text coming soon')
 
@@ -136,7 +152,7 @@ class AltTextFragmentTest(TestCase):
             image_document=self.document,
             status='pending',
         )
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'hx-get')
@@ -150,7 +166,7 @@ class AltTextFragmentTest(TestCase):
             image_document=self.document,
             status='processing',
         )
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'hx-get')
@@ -166,8 +182,9 @@ class AltTextFragmentTest(TestCase):
             alt_text='This is a test alt text.',
             model='gpt-4',
         )
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
-        response = self.client.get(url)
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'This is a test alt text')
         self.assertContains(response, 'gpt-4')
@@ -182,7 +199,7 @@ class AltTextFragmentTest(TestCase):
             status='failed',
             error='API error',
         )
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual(200, response.status_code)
         self.assertContains(response, 'Alt-text generation failed')
@@ -191,6 +208,114 @@ class AltTextFragmentTest(TestCase):
         """
         Checks that alt-text fragment sets Cache-Control header.
         """
-        url = reverse('alt_text_fragment_url', kwargs={'pk': self.test_uuid})
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
         response = self.client.get(url)
         self.assertEqual('no-store', response['Cache-Control'])
+
+    def test_alt_text_fragment_skips_large_columns(self) -> None:
+        """
+        Checks that alt-text fragment polling doesn't select the raw response json, prompt, or user groups.
+        """
+        OpenRouterAltText.objects.create(image_document=self.document, status='processing', prompt='long prompt')
+        url = reverse('alt_text_fragment_url', kwargs={'public_id': self.test_uuid})
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url)
+        selected_sql = ' '.join(query['sql'] for query in captured.captured_queries)
+        for column in ('raw_response_json', 'prompt', 'user_groups'):
+            self.assertNotIn(column, selected_sql)
+
+
+class PollDelayTest(SimpleTestCase):
+    """
+    Checks the polling backoff schedule.
+    """
+
+    def test_delay_grows_to_the_cap(self) -> None:
+        """
+        Checks that delays start at the minimum, grow by the growth factor, and stop at the maximum.
+        """
+        delays: list[int] = []
+        last_delay = ''
+        for _ in range(8):
+            request = RequestFactory().get('/', {'delay': last_delay})
+            next_delay = polling_helpers.get_next_poll_delay(request, polling_helpers.STATUS_POLL_MIN_DELAY_SECONDS)
+            delays.append(next_delay)
+            last_delay = str(next_delay)
+        self.assertEqual([2, 3, 4, 6, 9, 13, 15, 15], delays)
+
+    def test_malformed_delay_restarts_at_minimum(self) -> None:
+        """
+        Checks that a non-numeric delay param falls back to the minimum delay.
+        """
+        request = RequestFactory().get('/', {'delay': 'soon'})
+        self.assertEqual(
+            polling_helpers.ALT_TEXT_POLL_MIN_DELAY_SECONDS,
+            polling_helpers.get_next_poll_delay(request, polling_helpers.ALT_TEXT_POLL_MIN_DELAY_SECONDS),
+        )
+
+
+@override_settings(
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'status-fragment-tests',
+        }
+    }
+)
+class StatusFragmentCacheTest(TestCase):
+    """
+    Checks caching of the rendered status fragment.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """
+        Sets up a completed document.
+        """
+        cls.test_uuid = uuid.uuid4()
+        cls.document = ImageDocument.objects.create(
+            public_id=cls.test_uuid,
+            original_filename='test.png',
+            file_checksum='test_checksum_status_cache',
+            file_size=1024,
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='completed',
+        )
+
+    def setUp(self) -> None:
+        """
+        Clears the test cache, including the per-delay entries of polling fragments.
+        """
+        cache.clear()
+
+    def test_completed_status_fragment_is_served_from_cache(self) -> None:
+        """
+        Checks that a repeat poll of a completed status is served without a database query.
+        """
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
+        first_response = self.client.get(url)
+        with self.assertNumQueries(0):
+            second_response = self.client.get(url)
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertEqual('no-store', second_response['Cache-Control'])
+
+    def test_invalidation_renders_new_status(self) -> None:
+        """
+        Checks that deleting the cached fragment makes the next poll reflect a status change.
+        """
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
+        self.client.get(url)
+        ImageDocument.objects.filter(pk=self.document.pk).update(processing_status='pending')
+        cache_helpers.delete_status_fragment_html(self.test_uuid)
+        response = self.client.get(url)
+        self.assertContains(response, 'queued for processing')
+
+    def test_failed_status_fragment_is_only_cached_briefly(self) -> None:
+        """
+        Checks that a failed status isn't cached as a long-lived, non-polling fragment.
+        """
+        ImageDocument.objects.filter(pk=self.document.pk).update(processing_status='failed')
+        url = reverse('status_fragment_url', kwargs={'public_id': self.test_uuid})
+        self.client.get(url)
+        self.assertIsNone(cache.get(cache_helpers.build_status_fragment_cache_key(self.test_uuid)))
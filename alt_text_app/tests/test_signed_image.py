@@ -0,0 +1,82 @@
+"""
+Tests for signed image urls sent to OpenRouter.
+"""
+
+import logging
+import tempfile
+from pathlib import Path
+
+from django.core import signing
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from alt_text_app.lib import image_helpers
+from alt_text_app.models import ImageDocument
+
+log = logging.getLogger(__name__)
+
+
+class SignedImageUrlTest(TestCase):
+    """
+    Checks building and serving signed image urls.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a test document and its stored image file.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_bytes = b'\x89PNG\r\n\x1a\n' + b'test'
+        self.doc = ImageDocument.objects.create(
+            original_filename='test.png',
+            file_checksum='abc123',
+            file_size=len(self.image_bytes),
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='pending',
+        )
+        self.image_path = Path(self.temp_dir.name).resolve() / 'abc123.png'
+        self.image_path.write_bytes(self.image_bytes)
+
+    def tearDown(self) -> None:
+        """
+        Cleans up temporary files.
+        """
+        self.temp_dir.cleanup()
+
+    @override_settings(OPENROUTER_IMAGE_URL_ROOT='')
+    def test_without_url_root_uses_data_url(self) -> None:
+        """
+        Checks that an unconfigured url-root falls back to an inline data url.
+        """
+        image_url = image_helpers.build_openrouter_image_url('abc123', self.image_path, 'image/png')
+        self.assertTrue(image_url.startswith('data:image/png;base64,'))
+
+    def test_signed_url_serves_image(self) -> None:
+        """
+        Checks that a signed url built for OpenRouter serves the stored image bytes.
+        """
+        with override_settings(OPENROUTER_IMAGE_URL_ROOT='https://example.edu/', IMAGE_UPLOAD_PATH=self.temp_dir.name):
+            image_url = image_helpers.build_openrouter_image_url('abc123', self.image_path, 'image/png')
+            self.assertTrue(image_url.startswith('https://example.edu/image/signed/'))
+            response = self.client.get(image_url.removeprefix('https://example.edu'))
+            self.assertEqual(200, response.status_code)
+            self.assertEqual('image/png', response['Content-Type'])
+            self.assertEqual(self.image_bytes, b''.join(response.streaming_content))
+
+    def test_tampered_token_is_forbidden(self) -> None:
+        """
+        Checks that a token with a bad signature is rejected.
+        """
+        token = signing.TimestampSigner(salt=image_helpers.SIGNED_IMAGE_SALT).sign('abc123')
+        response = self.client.get(f'/image/signed/{token}x/')
+        self.assertEqual(403, response.status_code)
+
+    def test_expired_token_is_forbidden(self) -> None:
+        """
+        Checks that a token older than the max-age is rejected.
+        """
+        token = signing.TimestampSigner(salt=image_helpers.SIGNED_IMAGE_SALT).sign('abc123')
+        with override_settings(SIGNED_IMAGE_URL_MAX_AGE_SECONDS=-1):
+            response = self.client.get(f'/image/signed/{token}/')
+        self.assertEqual(403, response.status_code)
@@ -2,6 +2,7 @@
 Tests for synchronous image processing with timeout fallback.
 """
 
+import datetime
 import logging
 import tempfile
 from pathlib import Path
@@ -9,9 +10,16 @@ from unittest.mock import patch
 
 import httpx
 from django.test import TestCase
+from django.test.utils import override_settings
 
-from alt_text_app.lib.sync_processing_helpers import attempt_openrouter_sync
+from alt_text_app.lib.sync_processing_helpers import (
+    attempt_openrouter_sync,
+    attempt_synchronous_processing,
+    claim_document_for_processing,
+    run_background_processing,
+)
 from alt_text_app.models import ImageDocument, OpenRouterAltText
+from scripts import process_openrouter_summaries
 
 log = logging.getLogger(__name__)
 
@@ -21,11 +29,12 @@ class SyncOpenRouterProcessingTest(TestCase):
     Checks synchronous OpenRouter processing with timeout handling.
     """
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpTestData(cls) -> None:
         """
-        Creates a test document and image file.
+        Creates a test document.
         """
-        self.doc = ImageDocument.objects.create(
+        cls.doc = ImageDocument.objects.create(
             original_filename='test.png',
             file_checksum='abc123',
             file_size=1024,
@@ -33,6 +42,11 @@ class SyncOpenRouterProcessingTest(TestCase):
             file_extension='png',
             processing_status='pending',
         )
+
+    def setUp(self) -> None:
+        """
+        Creates a test image file.
+        """
         self.temp_dir = tempfile.TemporaryDirectory()
         self.image_path = Path(self.temp_dir.name) / 'test.png'
         self.image_path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'test')
@@ -130,6 +144,32 @@ class SyncOpenRouterProcessingTest(TestCase):
         self.doc.refresh_from_db()
         self.assertEqual(self.doc.processing_status, 'failed')
 
+    def test_openrouter_sync_resets_existing_record(self) -> None:
+        """
+        Checks that a previously-failed alt-text record is reused and reset in place.
+        """
+        OpenRouterAltText.objects.create(image_document=self.doc, status='failed', error='old error', prompt='old')
+        with patch('alt_text_app.lib.sync_processing_helpers.openrouter_helpers.get_api_key', return_value='test-key'):
+            with patch(
+                'alt_text_app.lib.sync_processing_helpers.openrouter_helpers.get_model_order',
+                return_value=['test-model'],
+            ):
+                with patch(
+                    'alt_text_app.lib.sync_processing_helpers.openrouter_helpers.build_prompt',
+                    return_value='test prompt',
+                ):
+                    with patch(
+                        'alt_text_app.lib.sync_processing_helpers.openrouter_helpers.call_openrouter_with_model_order',
+                        side_effect=httpx.TimeoutException('Timeout'),
+                    ):
+                        attempt_openrouter_sync(self.doc, self.image_path)
+
+        self.assertEqual(1, OpenRouterAltText.objects.filter(image_document=self.doc).count())
+        alt_text_record = OpenRouterAltText.objects.get(image_document=self.doc)
+        self.assertEqual('pending', alt_text_record.status)
+        self.assertEqual('test prompt', alt_text_record.prompt)
+        self.assertIsNotNone(alt_text_record.requested_at)
+
     def test_openrouter_skipped_without_credentials(self) -> None:
         """
         Checks that OpenRouter is skipped if credentials are missing.
@@ -143,3 +183,120 @@ class SyncOpenRouterProcessingTest(TestCase):
 
         self.assertFalse(result)
         self.assertFalse(OpenRouterAltText.objects.filter(image_document=self.doc).exists())
+        self.doc.refresh_from_db()
+        self.assertEqual('pending', self.doc.processing_status)
+
+
+class BackgroundProcessingTest(TestCase):
+    """
+    Checks the background-thread entry point for processing.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """
+        Creates a test document.
+        """
+        cls.doc = ImageDocument.objects.create(
+            original_filename='test.png',
+            file_checksum='abc123',
+            file_size=1024,
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='pending',
+        )
+        cls.image_path = Path('/tmp/abc123.png')
+
+    def test_run_background_processing_refetches_document(self) -> None:
+        """
+        Checks that the pool task loads the document by pk and hands it to attempt_synchronous_processing().
+        """
+        with patch('alt_text_app.lib.sync_processing_helpers.close_old_connections'):
+            with patch('alt_text_app.lib.sync_processing_helpers.attempt_synchronous_processing') as mock_attempt:
+                run_background_processing(self.doc.pk, self.image_path)
+        mock_attempt.assert_called_once()
+        called_doc, called_path = mock_attempt.call_args.args
+        self.assertEqual(self.doc.pk, called_doc.pk)
+        self.assertIsNot(self.doc, called_doc)
+        self.assertEqual(self.image_path, called_path)
+
+    def test_run_background_processing_logs_errors(self) -> None:
+        """
+        Checks that a failure in the pool task is logged rather than raised.
+        """
+        with patch('alt_text_app.lib.sync_processing_helpers.close_old_connections'):
+            with patch(
+                'alt_text_app.lib.sync_processing_helpers.attempt_synchronous_processing',
+                side_effect=Exception('boom'),
+            ):
+                with self.assertLogs('alt_text_app.lib.sync_processing_helpers', level='ERROR'):
+                    run_background_processing(self.doc.pk, self.image_path)
+
+
+class ClaimDocumentTest(TestCase):
+    """
+    Checks that the background job and the cron script claim a document at most once.
+    """
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """
+        Creates a test document.
+        """
+        cls.doc = ImageDocument.objects.create(
+            original_filename='test.png',
+            file_checksum='claim123',
+            file_size=1024,
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='pending',
+        )
+
+    def test_pending_document_is_claimed_once(self) -> None:
+        """
+        Checks that a pending document is claimed by the first caller only.
+        """
+        self.assertTrue(claim_document_for_processing(self.doc))
+        self.assertEqual('processing', self.doc.processing_status)
+        other_copy = ImageDocument.objects.get(pk=self.doc.pk)
+        self.assertFalse(claim_document_for_processing(other_copy, recover_stuck=True))
+        self.doc.refresh_from_db()
+        self.assertEqual('processing', self.doc.processing_status)
+        self.assertIsNotNone(self.doc.processing_started_at)
+
+    def test_stuck_document_is_recovered(self) -> None:
+        """
+        Checks that a 'processing' document is only reclaimed once it is older than the recovery threshold.
+        """
+        started_at = datetime.datetime.now() - datetime.timedelta(seconds=60)
+        ImageDocument.objects.filter(pk=self.doc.pk).update(processing_status='processing', processing_started_at=started_at)
+        with override_settings(RECOVER_STUCK_PROCESSING_AFTER_SECONDS=600):
+            self.assertFalse(claim_document_for_processing(self.doc, recover_stuck=True))
+        with override_settings(RECOVER_STUCK_PROCESSING_AFTER_SECONDS=30):
+            self.assertFalse(claim_document_for_processing(self.doc))
+            self.assertTrue(claim_document_for_processing(self.doc, recover_stuck=True))
+        self.doc.refresh_from_db()
+        self.assertGreater(self.doc.processing_started_at, started_at)
+
+    def test_claimed_document_is_skipped_by_background_job(self) -> None:
+        """
+        Checks that the background job doesn't call OpenRouter for a document the cron script already claimed.
+        """
+        self.assertTrue(claim_document_for_processing(self.doc, recover_stuck=True))
+        with patch('alt_text_app.lib.sync_processing_helpers.attempt_openrouter_sync') as mock_sync:
+            attempt_synchronous_processing(ImageDocument.objects.get(pk=self.doc.pk), Path('/tmp/claim123.png'))
+        mock_sync.assert_not_called()
+
+    def test_claimed_document_is_skipped_by_cron_thread(self) -> None:
+        """
+        Checks that a cron pool thread claims its document as it starts, and skips one the background job holds.
+        """
+        self.assertTrue(claim_document_for_processing(self.doc))
+        with patch('scripts.process_openrouter_summaries.close_old_connections'):
+            with patch('scripts.process_openrouter_summaries.process_single_alt_text') as mock_process:
+                result = process_openrouter_summaries.process_single_alt_text_in_thread(
+                    ImageDocument.objects.get(pk=self.doc.pk), 'test-key', ['test-model']
+                )
+        self.assertIsNone(result)
+        mock_process.assert_not_called()
+
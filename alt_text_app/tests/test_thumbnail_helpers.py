@@ -0,0 +1,87 @@
+"""
+Tests for thumbnail generation.
+"""
+
+import io
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+from django.test import SimpleTestCase as TestCase
+
+from alt_text_app.lib import thumbnail_helpers
+
+
+class GenerateThumbnailTest(TestCase):
+    """
+    Checks generate_thumbnail_webp() against the thumbnail specification.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a temporary directory for source images.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """
+        Cleans up temporary files.
+        """
+        self.temp_dir.cleanup()
+
+    def save_source_image(self, filename: str, size: tuple[int, int], image_format: str) -> Path:
+        """
+        Saves a solid-color source image and returns its path.
+        """
+        image_path = Path(self.temp_dir.name) / filename
+        with Image.new('RGB', size, color='green') as image:
+            image.save(image_path, format=image_format)
+        return image_path
+
+    def test_large_jpeg_downscaled_and_cropped(self) -> None:
+        """
+        Checks that a large JPEG is scaled to 100px tall and left-cropped to 200px wide.
+        """
+        image_path = self.save_source_image('large.jpg', (4000, 1000), 'JPEG')
+        thumbnail_bytes, width_px, height_px = thumbnail_helpers.generate_thumbnail_webp(image_path)
+        self.assertEqual((200, 100), (width_px, height_px))
+        with Image.open(io.BytesIO(thumbnail_bytes)) as thumbnail:
+            self.assertEqual('WEBP', thumbnail.format)
+            self.assertEqual((200, 100), thumbnail.size)
+
+    def test_tall_png_keeps_aspect_ratio(self) -> None:
+        """
+        Checks that a tall PNG is scaled to 100px tall with its aspect ratio preserved.
+        """
+        image_path = self.save_source_image('tall.png', (300, 600), 'PNG')
+        _thumbnail_bytes, width_px, height_px = thumbnail_helpers.generate_thumbnail_webp(image_path)
+        self.assertEqual((50, 100), (width_px, height_px))
+
+    def test_small_image_not_upscaled(self) -> None:
+        """
+        Checks that an image under the max height isn't resized.
+        """
+        image_path = self.save_source_image('small.png', (40, 20), 'PNG')
+        _thumbnail_bytes, width_px, height_px = thumbnail_helpers.generate_thumbnail_webp(image_path)
+        self.assertEqual((40, 20), (width_px, height_px))
+
+    def test_exif_orientation_applied(self) -> None:
+        """
+        Checks that EXIF orientation is applied before sizing (a rotated 400x200 source becomes 50x100).
+        """
+        image_path = Path(self.temp_dir.name) / 'rotated.jpg'
+        with Image.new('RGB', (400, 200), color='green') as image:
+            exif = image.getexif()
+            exif[0x0112] = 6  # Orientation: rotate 90 CW
+            image.save(image_path, format='JPEG', exif=exif.tobytes())
+        _thumbnail_bytes, width_px, height_px = thumbnail_helpers.generate_thumbnail_webp(image_path)
+        self.assertEqual((50, 100), (width_px, height_px))
+
+    def test_undecodable_file_raises(self) -> None:
+        """
+        Checks that a non-image file raises ThumbnailError.
+        """
+        image_path = Path(self.temp_dir.name) / 'broken.png'
+        image_path.write_bytes(b'not an image')
+        with self.assertRaises(thumbnail_helpers.ThumbnailError):
+            thumbnail_helpers.generate_thumbnail_webp(image_path)
@@ -4,7 +4,6 @@ Tests for the image upload view.
 
 import base64
 import hashlib
-import io
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -36,7 +35,7 @@ class ImageUploadViewTest(TestCase):
 
         with tempfile.TemporaryDirectory() as temp_dir:
             with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
-                with patch('alt_text_app.views.sync_processing_helpers.attempt_synchronous_processing'):
+                with patch('alt_text_app.views.sync_processing_helpers.queue_background_processing') as mock_queue:
                     response = self.client.post(
                         reverse('image_upload_url'),
                         {'image_file': upload},
@@ -48,13 +47,78 @@ class ImageUploadViewTest(TestCase):
                 self.assertEqual('valid_image.png', document.original_filename)
                 self.assertEqual(expected_checksum, document.file_checksum)
                 self.assertEqual('pending', document.processing_status)
-                self.assertIsNotNone(document.thumbnail_webp)
                 self.assertIsNotNone(document.thumbnail_created_at)
                 self.assertIsNone(document.thumbnail_error)
 
-                with Image.open(io.BytesIO(document.thumbnail_webp)) as thumbnail:
+                thumbnail_path = Path(temp_dir) / 'thumbnails' / f'{expected_checksum}.webp'
+                with Image.open(thumbnail_path) as thumbnail:
                     self.assertEqual('WEBP', thumbnail.format)
 
                 expected_path = Path(temp_dir) / f'{expected_checksum}.png'
                 self.assertTrue(expected_path.exists())
                 self.assertEqual(image_bytes, expected_path.read_bytes())
+                mock_queue.assert_called_once_with(document.pk, expected_path.resolve())
+
+    def test_upload_resets_failed_document(self) -> None:
+        """
+        Checks that re-uploading a failed image resets its existing record to pending and re-queues it.
+        """
+        fixture_path = Path(__file__).resolve().parent / 'fixtures' / 'valid_image.png.b64'
+        image_bytes = base64.b64decode(fixture_path.read_text(encoding='utf-8'))
+        failed_document = ImageDocument.objects.create(
+            original_filename='valid_image.png',
+            file_checksum=hashlib.sha256(image_bytes).hexdigest(),
+            file_size=len(image_bytes),
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='failed',
+            processing_error='earlier failure',
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
+                with patch('alt_text_app.views.sync_processing_helpers.queue_background_processing') as mock_queue:
+                    response = self.client.post(
+                        reverse('image_upload_url'),
+                        {'image_file': SimpleUploadedFile('valid_image.png', image_bytes, content_type='image/png')},
+                    )
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(1, ImageDocument.objects.count())
+        failed_document.refresh_from_db()
+        self.assertEqual('pending', failed_document.processing_status)
+        self.assertIsNone(failed_document.processing_error)
+        mock_queue.assert_called_once()
+        self.assertEqual(failed_document.pk, mock_queue.call_args.args[0])
+
+    def test_duplicate_upload_under_other_extension_removes_new_copy(self) -> None:
+        """
+        Checks that re-uploading a completed image under another extension redirects without leaving an orphan file.
+        """
+        fixture_path = Path(__file__).resolve().parent / 'fixtures' / 'valid_image.png.b64'
+        image_bytes = base64.b64decode(fixture_path.read_text(encoding='utf-8'))
+        checksum = hashlib.sha256(image_bytes).hexdigest()
+        completed_document = ImageDocument.objects.create(
+            original_filename='valid_image.png',
+            file_checksum=checksum,
+            file_size=len(image_bytes),
+            mime_type='image/png',
+            file_extension='png',
+            processing_status='completed',
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with override_settings(IMAGE_UPLOAD_PATH=temp_dir):
+                existing_path = Path(temp_dir) / f'{checksum}.png'
+                existing_path.write_bytes(image_bytes)
+                with patch('alt_text_app.views.sync_processing_helpers.queue_background_processing') as mock_queue:
+                    response = self.client.post(
+                        reverse('image_upload_url'),
+                        {'image_file': SimpleUploadedFile('valid_image.webp', image_bytes, content_type='image/png')},
+                    )
+                self.assertEqual(
+                    reverse('image_report_url', kwargs={'public_id': completed_document.public_id}), response.url
+                )
+                self.assertTrue(existing_path.exists())
+                self.assertFalse((Path(temp_dir) / f'{checksum}.webp').exists())
+        mock_queue.assert_not_called()
+
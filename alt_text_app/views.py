@@ -1,19 +1,36 @@
 import datetime
-import json
 import logging
 import uuid
 from pathlib import Path
 
-import trio
 from django.conf import settings as project_settings
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse, HttpResponseNotFound, HttpResponseRedirect
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+    HttpResponseRedirect,
+)
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
 from alt_text_app.forms import ImageUploadForm
-from alt_text_app.lib import image_helpers, markdown_helpers, sync_processing_helpers, thumbnail_helpers, version_helper
-from alt_text_app.lib.version_helper import GatherCommitAndBranchData
+from alt_text_app.lib import (
+    cache_helpers,
+    image_helpers,
+    json_helpers,
+    markdown_helpers,
+    polling_helpers,
+    sync_processing_helpers,
+    thumbnail_helpers,
+    version_helper,
+)
 from alt_text_app.models import ImageDocument, OpenRouterAltText
 
 log = logging.getLogger(__name__)
@@ -43,10 +60,8 @@ def info(request):
     ## prep response ------------------------------------------------
     if request.GET.get('format', '') == 'json':
         log.debug('building json response')
-        resp = HttpResponse(
-            json.dumps(context, sort_keys=True, indent=2),
-            content_type='application/json; charset=utf-8',
-        )
+        output: str = json_helpers.build_json_output(context, request)
+        resp = HttpResponse(output, content_type='application/json; charset=utf-8')
     else:
         log.debug('building template response')
         resp = render(request, 'alt_text_app/info.html', context)
@@ -55,10 +70,10 @@ def info(request):
 
 def upload_image(request: HttpRequest) -> HttpResponse:
     """
-    Handles image upload with synchronous processing attempt.
+    Handles image upload; the OpenRouter attempt is queued in the background.
 
-    Attempts to call OpenRouter synchronously with timeout.
-    Falls back to polling + cron if timeouts are hit.
+    The report page polls for status while the background attempt runs (with timeout).
+    Falls back to cron if timeouts are hit.
     """
     log.debug('\n\nstarting upload_image()\n\n')
     if request.method == 'POST':
@@ -69,59 +84,78 @@ def upload_image(request: HttpRequest) -> HttpResponse:
             ## Get Shibboleth user info
             user_info: dict[str, str | list[str]] = image_helpers.get_shibboleth_user_info(request)
 
-            ## Generate checksum
-            checksum: str = image_helpers.generate_checksum(image_file)
-
-            ## Check if already processed
-            existing_doc: ImageDocument | None = ImageDocument.objects.filter(file_checksum=checksum).first()
-
-            if existing_doc and existing_doc.processing_status == 'completed':
-                messages.info(request, 'This image has already been processed.')
-                return HttpResponseRedirect(reverse('image_report_url', kwargs={'pk': existing_doc.pk}))
-
-            ## For pending/processing docs, redirect to report (let polling handle it)
-            if existing_doc and existing_doc.processing_status in ('pending', 'processing'):
-                messages.info(request, 'This image is already being processed.')
-                return HttpResponseRedirect(reverse('image_report_url', kwargs={'pk': existing_doc.pk}))
-
-            ## For failed docs, allow re-upload by resetting to pending
-            if existing_doc and existing_doc.processing_status == 'failed':
-                doc: ImageDocument = existing_doc
-                doc.processing_status = 'pending'
-                doc.processing_error = None
-                doc.save(update_fields=['processing_status', 'processing_error'])
-            else:
-                ## Create new document record with Shibboleth user info
-                doc: ImageDocument = ImageDocument.objects.create(
-                    original_filename=image_file.name,
-                    file_checksum=checksum,
-                    file_size=image_file.size,
-                    mime_type=image_file.content_type or '',
-                    file_extension=Path(image_file.name).suffix.lower().lstrip('.'),
-                    user_first_name=user_info['first_name'],
-                    user_last_name=user_info['last_name'],
-                    user_email=user_info['email'],
-                    user_groups=user_info['groups'],
-                    processing_status='pending',
-                )
-
-            ## Save file
+            ## Save file and generate checksum (single pass over the upload)
+            file_extension: str = Path(image_file.name).suffix.lower().lstrip('.')
             try:
-                image_path: Path = image_helpers.save_image_file(
-                    image_file,
-                    checksum,
-                    doc.file_extension,
+                image_path, checksum = image_helpers.stream_upload_to_disk(image_file, file_extension)
+                log.debug('saved image file to %s', image_path)
+            except Exception:
+                log.exception('Failed to save image file')
+                messages.error(request, 'Failed to save image. Please try again.')
+                return HttpResponseRedirect(reverse('image_upload_url'))
+
+            ## Look up (and lock) any existing record, and create or reset it in the same transaction, so concurrent
+            ##   uploads of one file neither insert duplicates nor both re-queue a failed record
+            doc: ImageDocument | None = None
+            with transaction.atomic():
+                existing_doc: ImageDocument | None = (
+                    ImageDocument.objects.select_for_update().filter(file_checksum=checksum).first()
                 )
-                log.debug(f'saved image file to {image_path}')
+                if existing_doc is None:
+                    try:
+                        with transaction.atomic():
+                            ## Create new document record with Shibboleth user info
+                            doc = ImageDocument.objects.create(
+                                original_filename=image_file.name,
+                                file_checksum=checksum,
+                                file_size=image_file.size,
+                                mime_type=image_file.content_type or '',
+                                file_extension=file_extension,
+                                user_first_name=user_info['first_name'],
+                                user_last_name=user_info['last_name'],
+                                user_email=user_info['email'],
+                                user_groups=user_info['groups'],
+                                processing_status='pending',
+                            )
+                    except IntegrityError:
+                        ## a concurrent upload of the same file inserted it first
+                        existing_doc = ImageDocument.objects.select_for_update().get(file_checksum=checksum)
+                ## For failed docs, allow re-upload by resetting to pending
+                if existing_doc is not None and existing_doc.processing_status == 'failed':
+                    ImageDocument.objects.filter(pk=existing_doc.pk).update(
+                        processing_status='pending',
+                        processing_error=None,
+                        file_extension=file_extension,  # matches the file just saved
+                    )
+                    doc = existing_doc
+                    doc.processing_status = 'pending'
+                    doc.processing_error = None
+                    doc.file_extension = file_extension
+
+            if doc is None:
+                ## a re-upload under another extension saved a second copy that nothing references
+                if image_path.resolve() != image_helpers.get_image_path(checksum, existing_doc.file_extension).resolve():
+                    image_path.unlink(missing_ok=True)
+                if existing_doc.processing_status == 'completed':
+                    messages.info(request, 'This image has already been processed.')
+                else:
+                    ## pending/processing: let the report page's polling handle it
+                    messages.info(request, 'This image is already being processed.')
+                return HttpResponseRedirect(reverse('image_report_url', kwargs={'public_id': existing_doc.public_id}))
+
+            if existing_doc is not None:
+                cache_helpers.delete_status_fragment_html(doc.public_id)
+
+            ## Generate thumbnail
+            try:
                 thumbnail_bytes, thumb_width, thumb_height = thumbnail_helpers.generate_thumbnail_webp(image_path)
-                doc.thumbnail_webp = thumbnail_bytes
+                thumbnail_helpers.save_thumbnail_webp(checksum, thumbnail_bytes)
                 doc.thumbnail_created_at = datetime.datetime.now()
                 doc.thumbnail_error = None
                 doc.thumbnail_width_px = thumb_width
                 doc.thumbnail_height_px = thumb_height
                 doc.save(
                     update_fields=[
-                        'thumbnail_webp',
                         'thumbnail_created_at',
                         'thumbnail_error',
                         'thumbnail_width_px',
@@ -129,23 +163,20 @@ def upload_image(request: HttpRequest) -> HttpResponse:
                     ]
                 )
             except Exception as exc:
-                log.exception('Failed to save image file')
+                log.exception('Failed to generate thumbnail')
                 doc.processing_status = 'failed'
                 doc.processing_error = f'Failed to save file: {exc}'
                 doc.thumbnail_error = str(exc)
                 doc.save(update_fields=['processing_status', 'processing_error', 'thumbnail_error'])
                 messages.error(request, 'Failed to save image thumbnail. Please try again.')
-                return HttpResponseRedirect(reverse('image_report_url', kwargs={'pk': doc.pk}))
+                return HttpResponseRedirect(reverse('image_report_url', kwargs={'public_id': doc.public_id}))
 
-            ## Attempt synchronous processing
-            sync_processing_helpers.attempt_synchronous_processing(doc, image_path)
+            ## Queue processing; the report page polls for the result
+            sync_processing_helpers.queue_background_processing(doc.pk, image_path)
 
             ## Redirect to report page
-            if doc.processing_status == 'completed':
-                messages.success(request, 'Image processed.')
-            else:
-                messages.success(request, 'Image uploaded successfully. Processing in progress.')
-            return HttpResponseRedirect(reverse('image_report_url', kwargs={'pk': doc.pk}))
+            messages.success(request, 'Image uploaded successfully. Processing in progress.')
+            return HttpResponseRedirect(reverse('image_report_url', kwargs={'public_id': doc.public_id}))
     else:
         form: ImageUploadForm = ImageUploadForm()
 
@@ -154,25 +185,40 @@ def upload_image(request: HttpRequest) -> HttpResponse:
     ## end def upload_image()
 
 
-def view_report(request, pk: uuid.UUID):
+def view_report(request, public_id: uuid.UUID):
     """
     Displays the alt-text report for a processed image.
     """
-    log.debug(f'starting view_report() for pk={pk}')
-    doc = get_object_or_404(ImageDocument, pk=pk)
-
-    ## Get OpenRouter alt text if it exists
-    suggestions: OpenRouterAltText | None = None
-    try:
-        suggestions = doc.openrouter_alt_text
-    except OpenRouterAltText.DoesNotExist:
-        pass
+    log.debug('starting view_report() for public_id=%s', public_id)
+    ## joins the alt-text record in the same query; the reverse accessor is then cached (or absent, if there's none)
+    ## only the columns report.html and its fragments render (keep in sync with the templates)
+    doc = get_object_or_404(
+        ImageDocument.objects.select_related('openrouter_alt_text').only(
+            'id',
+            'public_id',
+            'original_filename',
+            'user_first_name',
+            'user_last_name',
+            'user_email',
+            'uploaded_at',
+            'file_size',
+            'processing_status',
+            'openrouter_alt_text__id',
+            'openrouter_alt_text__status',
+            'openrouter_alt_text__alt_text',
+            'openrouter_alt_text__model',
+        ),
+        public_id=public_id,
+    )
+    suggestions: OpenRouterAltText | None = getattr(doc, 'openrouter_alt_text', None)
 
     context = {
         'document': doc,
         'suggestions': suggestions,
+        'status_poll_delay_seconds': polling_helpers.STATUS_POLL_MIN_DELAY_SECONDS,
+        'alt_text_poll_delay_seconds': polling_helpers.ALT_TEXT_POLL_MIN_DELAY_SECONDS,
     }
-    log.debug(f'context, ``{context}``')
+    log.debug('context, ``%s``', context)
 
     return render(
         request,
@@ -186,46 +232,56 @@ def view_report(request, pk: uuid.UUID):
 # -------------------------------------------------------------------
 
 
-def status_fragment(request, pk: uuid.UUID):
+def status_fragment(request, public_id: uuid.UUID):
     """
     Returns a small HTML fragment for the status area.
-    Used by htmx polling on the report page.
+    Used by htmx polling on the report page, with a growing delay between polls.
     Stops polling when processing is complete or failed.
     """
-    log.debug(f'starting status_fragment() for pk={pk}')
-    doc = get_object_or_404(ImageDocument, pk=pk)
+    log.debug('starting status_fragment() for public_id=%s', public_id)
+    poll_delay_seconds: int = polling_helpers.get_next_poll_delay(request, polling_helpers.STATUS_POLL_MIN_DELAY_SECONDS)
+    html: str | None = cache_helpers.get_status_fragment_html(public_id, poll_delay_seconds)
+    if html is None:
+        ## the fragment only renders the status, so skip the wider columns (user_groups json, processing_error text)
+        doc = get_object_or_404(ImageDocument.objects.only('id', 'public_id', 'processing_status'), public_id=public_id)
 
-    ## Determine if we should continue polling
-    is_terminal = doc.processing_status in ('completed', 'failed')
+        ## Determine if we should continue polling
+        is_terminal = doc.processing_status in ('completed', 'failed')
 
-    context = {
-        'document': doc,
-        'is_terminal': is_terminal,
-    }
-    log.debug(f'context, ``{context}``')
+        context = {
+            'document': doc,
+            'is_terminal': is_terminal,
+            'status_poll_delay_seconds': poll_delay_seconds,
+        }
+        log.debug('context, ``%s``', context)
 
-    response = render(
-        request,
-        'alt_text_app/fragments/status_fragment.html',
-        context,
-    )
+        html = render_to_string('alt_text_app/fragments/status_fragment.html', context, request=request)
+        cache_helpers.set_status_fragment_html(public_id, html, doc.processing_status, poll_delay_seconds)
+
+    response = HttpResponse(html)
     response['Cache-Control'] = 'no-store'
     return response
 
 
-def alt_text_fragment(request, pk: uuid.UUID):
+def alt_text_fragment(request, public_id: uuid.UUID):
     """
     Returns an HTML fragment for the OpenRouter alt-text section.
     Can be polled or loaded once depending on UX preference.
     """
-    log.debug(f'starting alt_text_fragment() for pk={pk}')
-    doc = get_object_or_404(ImageDocument, pk=pk)
-
-    suggestions: OpenRouterAltText | None = None
-    try:
-        suggestions = doc.openrouter_alt_text
-    except OpenRouterAltText.DoesNotExist:
-        pass
+    log.debug('starting alt_text_fragment() for public_id=%s', public_id)
+    ## one query: joins the (possibly missing) alt-text row, skipping the raw response json and prompt
+    doc = get_object_or_404(
+        ImageDocument.objects.select_related('openrouter_alt_text').only(
+            'id',
+            'public_id',
+            'openrouter_alt_text__id',
+            'openrouter_alt_text__status',
+            'openrouter_alt_text__alt_text',
+            'openrouter_alt_text__model',
+        ),
+        public_id=public_id,
+    )
+    suggestions: OpenRouterAltText | None = getattr(doc, 'openrouter_alt_text', None)  # no query; None if missing
 
     response = render(
         request,
@@ -233,21 +289,69 @@ def alt_text_fragment(request, pk: uuid.UUID):
         {
             'document': doc,
             'suggestions': suggestions,
+            'alt_text_poll_delay_seconds': polling_helpers.get_next_poll_delay(
+                request, polling_helpers.ALT_TEXT_POLL_MIN_DELAY_SECONDS
+            ),
         },
     )
     response['Cache-Control'] = 'no-store'
     return response
 
 
-def image_preview(request, pk: uuid.UUID) -> HttpResponse:
+def image_preview(request, public_id: uuid.UUID) -> HttpResponse:
     """
     Streams the stored image for a report-page preview.
     """
-    log.debug(f'starting image_preview() for pk={pk}')
-    doc = get_object_or_404(ImageDocument, pk=pk)
-    if not doc.thumbnail_webp:
+    log.debug('starting image_preview() for public_id=%s', public_id)
+    doc = get_object_or_404(
+        ImageDocument.objects.only('id', 'file_checksum', 'file_extension', 'thumbnail_created_at'), public_id=public_id
+    )
+    if not doc.thumbnail_created_at:
+        return HttpResponseNotFound('<div>404 / Not Found</div>')
+    thumbnail_path: Path = image_helpers.get_thumbnail_path(doc.file_checksum)
+    ## the thumbnail is derived from the image's sha-256, so the checksum is a strong etag and the bytes never change
+    etag: str = f'"{doc.file_checksum}"'
+    last_modified: int = int(doc.thumbnail_created_at.timestamp())  # naive datetimes are in TIME_ZONE, the process tz
+    ## If-None-Match, else If-Modified-Since (rfc 9110 precedence); None when the client's copy is stale or absent
+    response: HttpResponse | None = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        ## no separate exists() stat: opening the file (or, with a sendfile header, the web server) reports it missing
+        try:
+            response = image_helpers.build_stored_file_response(thumbnail_path, 'image/webp')
+        except FileNotFoundError:
+            ## e.g., a document from before thumbnails moved to disk; rebuild it from the original
+            try:
+                thumbnail_helpers.regenerate_thumbnail_webp(doc.file_checksum, doc.file_extension)
+            except thumbnail_helpers.ThumbnailError:
+                log.warning('could not regenerate missing thumbnail for document %s', doc.pk)
+                return HttpResponseNotFound('<div>404 / Not Found</div>')
+            response = image_helpers.build_stored_file_response(thumbnail_path, 'image/webp')
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def signed_image(request, token: str) -> HttpResponse:
+    """
+    Serves the stored image to OpenRouter via a short-lived signed url.
+    """
+    log.debug('starting signed_image()')
+    try:
+        checksum: str = image_helpers.unsign_image_token(token)
+    except signing.BadSignature:
+        log.warning('rejected invalid or expired signed-image token')
+        return HttpResponseForbidden('<div>403 / Forbidden</div>')
+    doc = get_object_or_404(
+        ImageDocument.objects.only('id', 'file_checksum', 'file_extension', 'mime_type'), file_checksum=checksum
+    )
+    image_path: Path = image_helpers.get_image_path(doc.file_checksum, doc.file_extension)
+    try:
+        response = image_helpers.build_stored_file_response(image_path, doc.mime_type or 'application/octet-stream')
+    except FileNotFoundError:
         return HttpResponseNotFound('<div>404 / Not Found</div>')
-    return HttpResponse(doc.thumbnail_webp, content_type='image/webp')
+    response['Cache-Control'] = 'private, no-store'
+    return response
 
 
 # -------------------------------------------------------------------
@@ -263,7 +367,7 @@ def error_check(request):
     - (or substitue your own settings for localhost:1026)
     """
     log.debug('starting error_check()')
-    log.debug(f'project_settings.DEBUG, ``{project_settings.DEBUG}``')
+    log.debug('project_settings.DEBUG, ``%s``', project_settings.DEBUG)
     if project_settings.DEBUG is True:  # localdev and dev-server; never production
         log.debug('triggering exception')
         raise Exception('Raising intentional exception to check email-admins-on-error functionality.')
@@ -278,10 +382,8 @@ def version(request):
     """
     log.debug('starting version()')
     rq_now = datetime.datetime.now()
-    gatherer = GatherCommitAndBranchData()
-    trio.run(gatherer.manage_git_calls)
-    info_txt = f'{gatherer.branch} {gatherer.commit}'
+    info_txt: str = version_helper.get_branch_and_commit()
     context = version_helper.make_context(request, rq_now, info_txt)
-    output = json.dumps(context, sort_keys=True, indent=2)
-    log.debug(f'output, ``{output}``')
+    output: str = json_helpers.build_json_output(context, request)
+    log.debug('output, ``%s``', output)
     return HttpResponse(output, content_type='application/json; charset=utf-8')
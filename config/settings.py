@@ -95,6 +95,10 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASES: dict[str, object] = json.loads(os.environ['DATABASES_JSON'])
+## persistent connections (with a liveness check on reuse), unless DATABASES_JSON sets its own values
+for db_settings in DATABASES.values():
+    db_settings.setdefault('CONN_MAX_AGE', 600)
+    db_settings.setdefault('CONN_HEALTH_CHECKS', True)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -195,6 +199,13 @@ LOGGING: dict[str, object] = {
     },
 }
 
+## cache settings ---------------------------------------------------
+## defaults to the per-process memory cache when CACHES_JSON isn't set; multi-worker deployments should set a
+##   shared backend, so that workers share cached entries and their invalidations
+CACHES: dict[str, object] = json.loads(
+    os.environ.get('CACHES_JSON', '{"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}')
+)
+
 
 ## app-level settings -----------------------------------------------
 
@@ -206,6 +217,10 @@ OPENROUTER_API_KEY: str = os.environ.get('OPENROUTER_API_KEY', '')
 OPENROUTER_MODEL_ORDER_RAW: str = os.environ.get('OPENROUTER_MODEL_ORDER', '')
 OPENROUTER_MODEL_ORDER: list[str] = [model.strip() for model in OPENROUTER_MODEL_ORDER_RAW.split(',') if model.strip()]
 SYSTEM_CA_BUNDLE: str = os.environ.get('SYSTEM_CA_BUNDLE', '')
+## optional: public url-root (e.g., `https://example.edu/alt_text`) OpenRouter can fetch images from, via short-lived
+##   signed urls; when empty, images are sent inline as base64 data urls
+OPENROUTER_IMAGE_URL_ROOT: str = os.environ.get('OPENROUTER_IMAGE_URL_ROOT', '')
+SIGNED_IMAGE_URL_MAX_AGE_SECONDS: int = 300
 
 ## File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE: int = 52428800  # 50MB
@@ -214,9 +229,18 @@ DATA_UPLOAD_MAX_MEMORY_SIZE: int = 52428800  # 50MB
 ## Temp file storage
 IMAGE_UPLOAD_PATH: str = os.environ['IMAGE_UPLOAD_PATH']
 
+## optional: hand stored-image responses to the web server instead of streaming them from python
+##   - 'X-Sendfile' (apache mod_xsendfile): the header carries the file's absolute path
+##   - 'X-Accel-Redirect' (nginx): the header carries IMAGE_SENDFILE_ACCEL_ROOT + the path relative to IMAGE_UPLOAD_PATH
+IMAGE_SENDFILE_HEADER: str = os.environ.get('IMAGE_SENDFILE_HEADER', '')
+IMAGE_SENDFILE_ACCEL_ROOT: str = os.environ.get('IMAGE_SENDFILE_ACCEL_ROOT', '/internal_images')
+
 ## Synchronous processing timeouts (web requests)
 OPENROUTER_SYNC_TIMEOUT_SECONDS: float = 30.0
 
+## Per-process thread-pool size for upload processing (each worker mostly waits on OpenRouter)
+BACKGROUND_PROCESSING_MAX_WORKERS: int = int(os.environ.get('BACKGROUND_PROCESSING_MAX_WORKERS', '4'))
+
 ## Cron job timeouts (background processing - more patient)
 OPENROUTER_CRON_TIMEOUT_SECONDS: float = 60.0
 
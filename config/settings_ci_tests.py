@@ -81,6 +81,9 @@ DATABASES: dict[str, object] = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'local_data.db',
+        ## same connection lifecycle as config/settings.py's defaults
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -216,6 +219,10 @@ OPENROUTER_API_KEY: str = ''
 OPENROUTER_MODEL_ORDER_RAW: str = ''
 OPENROUTER_MODEL_ORDER: list[str] = []
 SYSTEM_CA_BUNDLE: str = ''
+## optional: public url-root (e.g., `https://example.edu/alt_text`) OpenRouter can fetch images from, via short-lived
+##   signed urls; when empty, images are sent inline as base64 data urls
+OPENROUTER_IMAGE_URL_ROOT: str = ''
+SIGNED_IMAGE_URL_MAX_AGE_SECONDS: int = 300
 
 ## File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE: int = 52428800  # 50MB
@@ -223,10 +230,15 @@ DATA_UPLOAD_MAX_MEMORY_SIZE: int = 52428800  # 50MB
 
 ## Temp file storage
 IMAGE_UPLOAD_PATH: str = '/baz'
+IMAGE_SENDFILE_HEADER: str = ''
+IMAGE_SENDFILE_ACCEL_ROOT: str = '/internal_images'
 
 ## Synchronous processing timeouts (web requests)
 OPENROUTER_SYNC_TIMEOUT_SECONDS: float = 30.0
 
+## Per-process thread-pool size for upload processing (each worker mostly waits on OpenRouter)
+BACKGROUND_PROCESSING_MAX_WORKERS: int = 4
+
 ## Cron job timeouts (background processing - more patient)
 OPENROUTER_CRON_TIMEOUT_SECONDS: float = 60.0
 
@@ -6,11 +6,13 @@ from alt_text_app import views
 urlpatterns = [
     ## main ---------------------------------------------------------
     path('image_uploader/', views.upload_image, name='image_upload_url'),
-    path('image/report/<uuid:pk>/', views.view_report, name='image_report_url'),
+    path('image/report/<uuid:public_id>/', views.view_report, name='image_report_url'),
     ## htmx fragment endpoints --------------------------------------
-    path('image/report/<uuid:pk>/status.fragment', views.status_fragment, name='status_fragment_url'),
-    path('image/report/<uuid:pk>/alt_text.fragment', views.alt_text_fragment, name='alt_text_fragment_url'),
-    path('image/preview/<uuid:pk>/', views.image_preview, name='image_preview_url'),
+    path('image/report/<uuid:public_id>/status.fragment', views.status_fragment, name='status_fragment_url'),
+    path('image/report/<uuid:public_id>/alt_text.fragment', views.alt_text_fragment, name='alt_text_fragment_url'),
+    path('image/preview/<uuid:public_id>/', views.image_preview, name='image_preview_url'),
+    ## openrouter image fetch (short-lived signed url) --------------
+    path('image/signed/<str:token>/', views.signed_image, name='signed_image_url'),
     path('info/', views.info, name='info_url'),
     ## other --------------------------------------------------------
     path('', views.root, name='root_url'),
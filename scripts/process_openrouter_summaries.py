@@ -2,11 +2,11 @@
 """
 Cron-driven script to generate OpenRouter alt text for pending images.
 
-Finds ImageDocument rows with pending/failed alt-text generation,
-calls OpenRouter API, and persists the results.
+Finds ImageDocument rows that are pending (or stuck in processing),
+claims them, calls OpenRouter API, and persists the results.
 
 Usage:
-    uv run ./scripts/process_openrouter_summaries.py [--batch-size N] [--dry-run]
+    uv run ./scripts/process_openrouter_summaries.py [--batch-size N] [--max-workers N] [--dry-run]
 
 Requires:
     OPENROUTER_API_KEY environment variable to be set.
@@ -17,6 +17,7 @@ import argparse
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -34,12 +35,16 @@ import django  # noqa: E402
 django.setup()
 
 from django.conf import settings as project_settings  # noqa: E402
+from django.db import close_old_connections, transaction  # noqa: E402
 from django.db.models import Q  # noqa: E402
 from django.utils import timezone as django_timezone  # noqa: E402
 
-from alt_text_app.lib import image_helpers, openrouter_helpers  # noqa: E402
+from alt_text_app.lib import image_helpers, openrouter_helpers, sync_processing_helpers  # noqa: E402
 from alt_text_app.models import ImageDocument, OpenRouterAltText  # noqa: E402
 
+## each job is one blocking OpenRouter call, so a batch's calls overlap on threads
+DEFAULT_MAX_WORKERS = 4
+
 
 def get_api_key() -> str:
     """
@@ -52,29 +57,35 @@ def find_pending_alt_text(batch_size: int) -> list[ImageDocument]:
     """
     Finds ImageDocument rows that need alt-text generation.
     Criteria:
-    - processing_status in ('pending', 'processing')
-    - does NOT have an OpenRouterAltText OR has one with status 'pending'/'failed'
+    - processing_status 'pending' (never started, or a timed-out sync attempt)
+    - OR processing_status 'processing' for longer than RECOVER_STUCK_PROCESSING_AFTER_SECONDS (an interrupted job)
     """
-    docs_without_alt_text = (
-        ImageDocument.objects.filter(processing_status__in=['pending', 'processing'])
-        .exclude(openrouter_alt_text__isnull=False)
-        .order_by('uploaded_at')[:batch_size]
-    )
-
-    docs_with_pending_alt_text = (
+    stuck_q = sync_processing_helpers.build_stuck_processing_q(datetime.now())
+    ## one query; the reverse one-to-one join yields at most one row per document, so no de-duplication is needed
+    docs = (
+        ## the IN is redundant with the OR, but lets the (processing_status, uploaded_at) index limit the scan to
+        ##   active rows (which are still sorted by uploaded_at, since the IN spans two index ranges)
         ImageDocument.objects.filter(processing_status__in=['pending', 'processing'])
-        .filter(Q(openrouter_alt_text__status='pending') | Q(openrouter_alt_text__status='failed'))
+        .filter(Q(processing_status='pending') | stuck_q)
+        .select_related('openrouter_alt_text')
+        ## just what processing reads and writes; skips user info, thumbnail metadata, and the alt-text row's
+        ##   raw response json and prompt
+        .only(
+            'id',
+            'original_filename',
+            'file_checksum',
+            'file_extension',
+            'mime_type',
+            'processing_status',
+            'processing_error',
+            'processing_started_at',
+            'openrouter_alt_text__id',
+            'openrouter_alt_text__image_document',
+            'openrouter_alt_text__status',
+        )
         .order_by('uploaded_at')[:batch_size]
     )
-
-    doc_ids: set[str] = set()
-    result: list[ImageDocument] = []
-    for doc in list(docs_without_alt_text) + list(docs_with_pending_alt_text):
-        if str(doc.pk) not in doc_ids and len(result) < batch_size:
-            doc_ids.add(str(doc.pk))
-            result.append(doc)
-
-    return result
+    return list(docs)
 
 
 def get_model_order() -> list[str]:
@@ -92,22 +103,20 @@ def process_single_alt_text(doc: ImageDocument, api_key: str, model_order: list[
     """
     log.info('Processing alt text for document %s (%s)', doc.pk, doc.original_filename)
 
-    alt_text_record: OpenRouterAltText
-    created: bool
+    ## Create (or reset) the alt-text record, prompt included, in one INSERT or UPDATE;
+    ##   find_pending_alt_text() already joined any existing record, so no SELECT is needed to tell which,
+    ##   and the claim in process_single_alt_text_in_thread() keeps the background job from creating one meanwhile
+    prompt = openrouter_helpers.build_prompt()
     utc_now = datetime.now(tz=timezone.utc)
     naive_now = django_timezone.make_naive(utc_now)
-    alt_text_record, created = OpenRouterAltText.objects.get_or_create(
-        image_document=doc,
-        defaults={'status': 'processing', 'requested_at': naive_now},
-    )
-
-    if not created:
-        utc_now = datetime.now(tz=timezone.utc)
-        naive_now = django_timezone.make_naive(utc_now)
-        alt_text_record.status = 'processing'
-        alt_text_record.requested_at = naive_now
-        alt_text_record.error = None
-        alt_text_record.save(update_fields=['status', 'requested_at', 'error'])
+    reset_values = {'status': 'processing', 'requested_at': naive_now, 'error': None, 'prompt': prompt}
+    alt_text_record: OpenRouterAltText | None = getattr(doc, 'openrouter_alt_text', None)
+    if alt_text_record is None:
+        alt_text_record = OpenRouterAltText.objects.create(image_document=doc, **reset_values)
+    else:
+        OpenRouterAltText.objects.filter(pk=alt_text_record.pk).update(**reset_values)
+        for field_name, value in reset_values.items():
+            setattr(alt_text_record, field_name, value)
 
     success = False
     try:
@@ -115,13 +124,8 @@ def process_single_alt_text(doc: ImageDocument, api_key: str, model_order: list[
         if not image_path.exists():
             raise FileNotFoundError(f'Image file not found: {image_path}')
 
-        prompt = openrouter_helpers.build_prompt()
         log.debug('Calling OpenRouter for document %s', doc.pk)
-
-        alt_text_record.prompt = prompt
-        alt_text_record.save(update_fields=['prompt'])
-
-        image_data_url = image_helpers.build_image_data_url(image_path, doc.mime_type)
+        image_data_url = image_helpers.build_openrouter_image_url(doc.file_checksum, image_path, doc.mime_type)
 
         timeout_seconds = project_settings.OPENROUTER_CRON_TIMEOUT_SECONDS
         response_json = openrouter_helpers.call_openrouter_with_model_order(
@@ -133,11 +137,12 @@ def process_single_alt_text(doc: ImageDocument, api_key: str, model_order: list[
         )
 
         parsed = openrouter_helpers.parse_openrouter_response(response_json)
-        openrouter_helpers.persist_openrouter_alt_text(alt_text_record, response_json, parsed)
-
-        doc.processing_status = 'completed'
-        doc.processing_error = None
-        doc.save(update_fields=['processing_status', 'processing_error'])
+        ## both rows' UPDATEs in one commit
+        with transaction.atomic():
+            openrouter_helpers.persist_openrouter_alt_text(alt_text_record, response_json, parsed)
+            doc.processing_status = 'completed'
+            doc.processing_error = None
+            doc.save(update_fields=['processing_status', 'processing_error'])
 
         log.info('Successfully generated alt text for document %s', doc.pk)
         success = True
@@ -146,15 +151,34 @@ def process_single_alt_text(doc: ImageDocument, api_key: str, model_order: list[
         log.exception('Failed to generate alt text for document %s', doc.pk)
         alt_text_record.status = 'failed'
         alt_text_record.error = str(exc)
-        alt_text_record.save(update_fields=['status', 'error'])
         doc.processing_status = 'failed'
         doc.processing_error = str(exc)
-        doc.save(update_fields=['processing_status', 'processing_error'])
+        with transaction.atomic():
+            alt_text_record.save(update_fields=['status', 'error'])
+            doc.save(update_fields=['processing_status', 'processing_error'])
+
+    return success
 
+
+def process_single_alt_text_in_thread(doc: ImageDocument, api_key: str, model_order: list[str]) -> bool | None:
+    """
+    Runs process_single_alt_text() on a pool thread, closing that thread's db connection before and after.
+    Returns None, without processing, when the document was claimed elsewhere (e.g., by its background job).
+    Called by process_alt_texts()
+    """
+    close_old_connections()
+    try:
+        ## claimed only as the work starts, so a doc queued behind the pool's other jobs can't age past
+        ##   RECOVER_STUCK_PROCESSING_AFTER_SECONDS and be re-claimed as stuck by the next cron run
+        if not sync_processing_helpers.claim_document_for_processing(doc, recover_stuck=True):
+            return None
+        success = process_single_alt_text(doc, api_key, model_order)
+    finally:
+        close_old_connections()
     return success
 
 
-def process_alt_texts(batch_size: int, dry_run: bool) -> tuple[int, int]:
+def process_alt_texts(batch_size: int, dry_run: bool, max_workers: int = DEFAULT_MAX_WORKERS) -> tuple[int, int]:
     """
     Finds and processes pending OpenRouter alt-text jobs.
     Returns (success_count, failure_count).
@@ -177,14 +201,21 @@ def process_alt_texts(batch_size: int, dry_run: bool) -> tuple[int, int]:
             log.info('[DRY RUN] Would generate alt text for: %s (%s)', doc.pk, doc.original_filename)
         return (0, 0)
 
-    success_count = 0
-    failure_count = 0
-
-    for doc in docs:
-        if process_single_alt_text(doc, api_key, model_order):
-            success_count += 1
-        else:
-            failure_count += 1
+    results: list[bool | None] = []
+    if docs:
+        with ThreadPoolExecutor(max_workers=min(len(docs), max_workers), thread_name_prefix='alt_text_cron') as executor:
+            results = list(
+                executor.map(
+                    process_single_alt_text_in_thread,
+                    docs,
+                    [api_key] * len(docs),
+                    [model_order] * len(docs),
+                )
+            )
+    success_count = results.count(True)
+    failure_count = results.count(False)
+    if None in results:
+        log.info('Skipped %s documents claimed elsewhere', results.count(None))
 
     return (success_count, failure_count)
 
@@ -200,6 +231,12 @@ def main() -> None:
         default=1,
         help='Maximum number of summaries to generate in one run (default: 1)',
     )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f'Maximum number of OpenRouter calls to run concurrently (default: {DEFAULT_MAX_WORKERS})',
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -222,8 +259,8 @@ def main() -> None:
     )
 
     log.info('Starting OpenRouter alt-text processor')
-    success_count, failure_count = process_alt_texts(args.batch_size, args.dry_run)
-    log.info(f'Finished: {success_count} succeeded, {failure_count} failed')
+    success_count, failure_count = process_alt_texts(args.batch_size, args.dry_run, args.max_workers)
+    log.info('Finished: %s succeeded, %s failed', success_count, failure_count)
 
 
 if __name__ == '__main__':